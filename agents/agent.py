@@ -1,12 +1,15 @@
-# pylint: disable = http-used,print-used,no-self-use
+# pylint: disable = http-used,no-self-use
 
 import datetime
+import functools
 import operator
 import os
-import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Annotated, TypedDict
 
-from dotenv import load_dotenv
+import orjson
 from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.checkpoint.memory import MemorySaver
@@ -14,20 +17,19 @@ from langgraph.graph import END, StateGraph
 
 from agents.tools.flights_finder import flights_finder
 from agents.tools.hotels_finder import hotels_finder
-from agents.utils.env_utils import get_env_var
+from agents.utils.env_utils import get_cached_env_var, get_env_var
 
-_ = load_dotenv()
+logger = logging.getLogger(__name__)
 
-CURRENT_YEAR = datetime.datetime.now().year
+TOOLS_MODEL = 'gemini-2.0-flash-lite'
 
 
 class AgentState(TypedDict):
     messages: Annotated[list[AnyMessage], operator.add]
 
 
-TOOLS_SYSTEM_PROMPT = f"""You are a smart travel agency with advanced city name standardization capabilities. You MUST ALWAYS use the tools to look up information.
+TOOLS_SYSTEM_PROMPT = """You are a smart travel agency with advanced city name standardization capabilities. You MUST ALWAYS use the tools to look up information.
     You are allowed to make multiple calls (either together or in sequence).
-    The current year is {CURRENT_YEAR}.
     
     CRITICAL RULES - NEVER IGNORE THESE:
     1. ALWAYS use flights_finder tool when ANY flight, airline, or travel between cities is mentioned
@@ -74,13 +76,64 @@ TOOLS_SYSTEM_PROMPT = f"""You are a smart travel agency with advanced city name
 TOOLS = [flights_finder, hotels_finder]
 
 
+@functools.lru_cache(maxsize=1)
+def system_message(year: int) -> SystemMessage:
+    """
+    Build the system message for the given year.
+
+    The static prompt comes first and the date-dependent part is appended after it, so the
+    prefix stays byte-identical across turns (and across midnight) for provider-side prompt
+    caches. The message object is reused for as long as the year does not change.
+    """
+    return SystemMessage(content=f'{TOOLS_SYSTEM_PROMPT}\n    The current year is {year}.\n')
+
+
+def _serialize(result) -> str:
+    """Encode a tool result as JSON for the ToolMessage, falling back to str() for non-JSON types"""
+    try:
+        return orjson.dumps(result).decode()
+    except TypeError:
+        return str(result)
+
+
+def trim_history(messages, limit: int):
+    """
+    Bound the conversation history sent to the LLM to roughly the last `limit` messages.
+
+    The window always starts at a human turn, so tool calls stay paired with their results;
+    if the current turn alone exceeds the limit it is sent whole. A limit <= 0 disables trimming.
+    """
+    if limit <= 0 or len(messages) <= limit:
+        return messages
+    turn_starts = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    start = next((i for i in turn_starts if i >= len(messages) - limit), turn_starts[-1] if turn_starts else 0)
+    return messages[start:]
+
+
+# Shared checkpointer, so conversation state survives across Agent() call sites in the process
+MEMORY = MemorySaver()
 
 
 class Agent:
+    """
+    Tool-calling travel agent. Agent() returns a process-wide instance, so the LLM client and
+    compiled graph are built once rather than on every construction.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
 
-    def __init__(self):
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance._setup()
+                cls._instance = instance
+        return cls._instance
+
+    def _setup(self):
         self._tools = {t.name: t for t in TOOLS}
-        self._tools_llm = ChatGoogleGenerativeAI(model='gemini-2.0-flash-lite', google_api_key=get_env_var('GOOGLE_API_KEY')).bind_tools(TOOLS)
+        self._tools_llm = ChatGoogleGenerativeAI(model=TOOLS_MODEL, google_api_key=get_env_var('GOOGLE_API_KEY')).bind_tools(TOOLS)
 
         builder = StateGraph(AgentState)
         builder.add_node('call_tools_llm', self.call_tools_llm)
@@ -89,39 +142,48 @@ class Agent:
 
         builder.add_conditional_edges('call_tools_llm', Agent.exists_action, {'more_tools': 'invoke_tools', END: END})
         builder.add_edge('invoke_tools', 'call_tools_llm')
-        memory = MemorySaver()
-        self.graph = builder.compile(checkpointer=memory)
+        self.graph = builder.compile(checkpointer=MEMORY)
 
-        print(self.graph.get_graph().draw_mermaid())
+        if get_env_var('DEBUG_MERMAID'):
+            logger.info('Agent graph:\n%s', self.graph.get_graph().draw_mermaid())
 
     @staticmethod
     def exists_action(state: AgentState):
         result = state['messages'][-1]
-        if len(result.tool_calls) == 0:
+        if not getattr(result, 'tool_calls', None):
             return END
         return 'more_tools'
 
     def call_tools_llm(self, state: AgentState):
-        messages = state['messages']
-        messages = [SystemMessage(content=TOOLS_SYSTEM_PROMPT)] + messages
+        messages = trim_history(state['messages'], int(get_cached_env_var('MAX_HISTORY_MESSAGES', '50')))
+        messages = [system_message(datetime.date.today().year), *messages]
         message = self._tools_llm.invoke(messages)
         return {'messages': [message]}
 
     def invoke_tools(self, state: AgentState):
         tool_calls = state['messages'][-1].tool_calls
-        results = []
-        for t in tool_calls:
-            print(f'Calling: {t}')
-            if not t['name'] in self._tools:  # check for bad tool name from LLM
-                print('\n ....bad tool name....')
-                result = 'bad tool name, retry'  # instruct LLM to retry if bad
-                content = result
-            else:
-                result = self._tools[t['name']].invoke(t['args'])
-                try:
-                    content = json.dumps(result)
-                except Exception:
-                    content = str(result)
-            results.append(ToolMessage(tool_call_id=t['id'], name=t['name'], content=content))
-        print('Back to the model!')
+        # Tool calls are independent I/O-bound SerpAPI requests, so run them concurrently
+        # and collect the results in the original order to keep tool_call_id association stable
+        max_workers = max(1, min(len(tool_calls), int(get_cached_env_var('TOOL_PARALLELISM', '4'))))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._run_tool, t) for t in tool_calls]
+            results = [future.result() for future in futures]
+        logger.debug('Back to the model!')
         return {'messages': results}
+
+    def _run_tool(self, t):
+        logger.debug('Calling: %s', t)
+        if not t['name'] in self._tools:  # check for bad tool name from LLM
+            logger.warning('Bad tool name from LLM: %s', t['name'])
+            result = 'bad tool name, retry'  # instruct LLM to retry if bad
+            content = result
+        else:
+            try:
+                result = self._tools[t['name']].invoke(t['args'])
+            except Exception as e:  # one failing tool should not cancel the others
+                logger.warning('Tool %s failed: %s', t['name'], e)
+                result = f'bad tool call ({e}), retry'
+            content = _serialize(result)
+        # The structured result rides along as the artifact so local consumers don't re-parse the JSON
+        return ToolMessage(tool_call_id=t['id'], name=t['name'], content=content, artifact=result)
+
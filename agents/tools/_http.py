@@ -0,0 +1,51 @@
+"""Pooled HTTP session for synchronous SerpAPI calls"""
+import functools
+import threading
+from typing import Any, Dict
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from agents.utils.env_utils import get_cached_env_var
+
+SERP_URL = 'https://serpapi.com/search.json'
+SERP_CONNECT_TIMEOUT = 5
+SERP_TIMEOUT = 30
+
+# One keep-alive connection pool for the whole process, so repeated tool calls skip the TLS handshake.
+# Retry honors Retry-After on 429s before backing off
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 502, 503, 504)),
+))
+
+
+@functools.lru_cache(maxsize=1)
+def _request_slots() -> threading.BoundedSemaphore:
+    """
+    Process-wide cap on in-flight SerpAPI requests, shared by the tool thread pools of all
+    concurrent chat requests. Set SERPAPI_CONCURRENCY=1 on plans with low rate limits.
+    """
+    return threading.BoundedSemaphore(max(1, int(get_cached_env_var('SERPAPI_CONCURRENCY', '8'))))
+
+
+def serp_get(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run a SerpAPI search over the shared session.
+
+    Args:
+        params: SerpAPI search parameters (same as for serpapi.search)
+
+    Returns:
+        Decoded JSON response
+    """
+    # Cache hits never get here, so they don't take a slot
+    with _request_slots():
+        # Fail fast when serpapi.com is unreachable, but give slow searches the full read timeout
+        response = _SESSION.get(SERP_URL, params=params, timeout=(SERP_CONNECT_TIMEOUT, SERP_TIMEOUT))
+    response.raise_for_status()
+    return orjson.loads(response.content)
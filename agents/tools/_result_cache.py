@@ -0,0 +1,103 @@
+"""Two-tier cache for SerpAPI tool results: an in-process TTL cache backed by SQLite on disk"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from cachetools import TTLCache
+import orjson
+
+from agents.utils.env_utils import get_cached_env_var, get_env_var
+
+logger = logging.getLogger(__name__)
+
+_CACHE = TTLCache(maxsize=512, ttl=float(get_env_var('CACHE_TTL_SECONDS', '600')))
+_LOCK = threading.Lock()
+
+# SQLite connection for the disk tier: None until first use, False if disabled or unavailable
+_disk = None
+# Expired disk rows are deleted on write, at most once per this many seconds
+_PRUNE_INTERVAL = 3600.0
+_last_prune = 0.0
+
+
+def _disk_db():
+    """Open the disk tier on first use; must be called with _LOCK held"""
+    global _disk
+    if _disk is None:
+        _disk = False
+        if get_env_var('DISK_CACHE_ENABLED', 'true').lower() != 'true':
+            return None
+        try:
+            cache_dir = os.path.expanduser(get_env_var('SERP_CACHE_DIR', '~/.cache/ai-travel-agent'))
+            os.makedirs(cache_dir, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(cache_dir, 'serp.sqlite'), check_same_thread=False)
+            conn.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, ts REAL, data TEXT)')
+            _disk = conn
+        except (OSError, sqlite3.Error) as e:
+            logger.warning('Disk cache unavailable, using the in-memory cache only: %s', e)
+    return _disk or None
+
+
+def cache_key(search_params: Dict[str, Any]) -> bytes:
+    """
+    Build a cache key from SerpAPI search parameters.
+
+    Args:
+        search_params: SerpAPI search parameters; the api_key is ignored
+
+    Returns:
+        16-byte digest of the remaining parameters
+    """
+    params = {key: value for key, value in search_params.items() if key != 'api_key'}
+    payload = orjson.dumps(params, default=str, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def get_cached(key: bytes) -> Optional[Any]:
+    """Return the cached results for key from memory or disk, or None on a miss"""
+    with _LOCK:
+        results = _CACHE.get(key)
+        if results is not None:
+            return results
+
+        db = _disk_db()
+        if db is None:
+            return None
+        max_age = float(get_cached_env_var('DISK_CACHE_TTL_SECONDS', '21600'))
+        try:
+            row = db.execute('SELECT ts, data FROM results WHERE key = ?', (key.hex(),)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning('Disk cache read failed: %s', e)
+            return None
+        if row is None or row[0] < time.time() - max_age:
+            return None
+        results = orjson.loads(row[1])
+        _CACHE[key] = results
+        return results
+
+
+def set_cached(key: bytes, results: Any) -> None:
+    """Store results for key; cached results are shared and must not be mutated"""
+    with _LOCK:
+        _CACHE[key] = results
+
+        db = _disk_db()
+        if db is None:
+            return
+        global _last_prune
+        now = time.time()
+        try:
+            with db:
+                db.execute('INSERT OR REPLACE INTO results (key, ts, data) VALUES (?, ?, ?)',
+                           (key.hex(), now, orjson.dumps(results, default=str).decode()))
+                # Reads already treat expired rows as misses; this keeps the table from growing forever
+                if now - _last_prune >= _PRUNE_INTERVAL:
+                    _last_prune = now
+                    max_age = float(get_cached_env_var('DISK_CACHE_TTL_SECONDS', '21600'))
+                    db.execute('DELETE FROM results WHERE ts < ?', (now - max_age,))
+        except sqlite3.Error as e:
+            logger.warning('Disk cache write failed: %s', e)
@@ -1,162 +1,290 @@
+import copy
+import datetime
+import functools
+import itertools
+import json
+import logging
+import re
+
+import requests
 import serpapi
-import os
-from typing import Optional, List, Dict, Any
+from typing import Optional
 from langchain_core.tools import tool
-from pydantic import BaseModel, Field
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator, model_validator
+from agents.utils.date_utils import validate_travel_date
 from agents.utils.env_utils import get_env_var
-from agents.utils.city_standardizer import CityStandardizer
+from agents.utils.city_standardizer import city_standardizer
+from agents.tools._http import serp_get
+from agents.tools._result_cache import cache_key, get_cached, set_cached
 
 
-def transform_serpapi_flights(serpapi_flights):
-    """
-    Transform SerpAPI flight response format to expected application format.
-    
-    Args:
-        serpapi_flights: List of flight data from SerpAPI
-        
-    Returns:
-        List of flights in expected format
-    """
-    transformed_flights = []
-    
-    for flight_option in serpapi_flights:
-        try:
-            # Get the main flight segments
-            flights = flight_option.get('flights', [])
-            if not flights:
-                continue
-                
-            # For multi-segment flights, we'll focus on the first segment for display
-            # but include all segments in the flights array
-            main_flight = flights[0]
-            
-            # Extract departure and arrival info
-            departure_airport = main_flight.get('departure_airport', {})
-            arrival_airport = flights[-1].get('arrival_airport', {})  # Use last segment for final destination
-            
-            # Format time strings
-            departure_time = departure_airport.get('time', 'Unknown')
-            arrival_time = arrival_airport.get('time', 'Unknown')
-            
-            # Convert time format from "2025-10-01 12:35" to "12:35 PM"
-            if departure_time != 'Unknown' and ' ' in departure_time:
-                time_part = departure_time.split(' ')[1]
-                departure_time = format_time_12hour(time_part)
-            
-            if arrival_time != 'Unknown' and ' ' in arrival_time:
-                time_part = arrival_time.split(' ')[1]
-                arrival_time = format_time_12hour(time_part)
-            
-            # Calculate total duration
-            total_duration = flight_option.get('total_duration', main_flight.get('duration', 0))
-            duration_str = f"{total_duration} minutes" if total_duration else "Unknown"
-            
-            # Determine number of stops
-            layovers = flight_option.get('layovers', [])
-            stops = len(layovers)
-            
-            # Create transformed flight object
-            transformed_flight = {
-                'flights': [
-                    {
-                        'departure_airport': {
-                            'id': departure_airport.get('id', 'Unknown'),
-                            'name': departure_airport.get('name', 'Unknown')
-                        },
-                        'arrival_airport': {
-                            'id': arrival_airport.get('id', 'Unknown'),
-                            'name': arrival_airport.get('name', 'Unknown')
-                        },
-                        'airline': main_flight.get('airline', 'Unknown'),
-                        'flight_number': main_flight.get('flight_number', 'Unknown'),
-                        'departure_time': departure_time,
-                        'arrival_time': arrival_time,
-                        'duration': duration_str,
-                        'aircraft': main_flight.get('airplane', 'Unknown'),
-                        'stops': stops
-                    }
-                ],
-                'price': flight_option.get('price', 'N/A'),
-                'type': 'Direct' if stops == 0 else f'{stops} stop{"s" if stops > 1 else ""}'
+logger = logging.getLogger(__name__)
+
+# Number of flight options returned to the agent (the chat UI shows six cards)
+FLIGHTS_RESULT_LIMIT = 6
+
+# Sample flights served when SerpAPI returns no results; airport ids are patched per request
+_SAMPLE_FLIGHTS = (
+    {
+        'flights': [
+            {
+                'departure_airport': {'id': 'BBI', 'name': 'Biju Patnaik International Airport'},
+                'arrival_airport': {'id': 'VTZ', 'name': 'Visakhapatnam Airport'},
+                'airline': 'IndiGo',
+                'flight_number': '6E 6214',
+                'departure_time': '06:30 AM',
+                'arrival_time': '07:50 AM',
+                'duration': '80 minutes',
+                'aircraft': 'Airbus A320neo',
+                'stops': 0
             }
-            
-            transformed_flights.append(transformed_flight)
-            
-        except Exception as e:
-            continue
-    
-    return transformed_flights
+        ],
+        'price': 168,
+        'type': 'Direct'
+    },
+    {
+        'flights': [
+            {
+                'departure_airport': {'id': 'BBI', 'name': 'Biju Patnaik International Airport'},
+                'arrival_airport': {'id': 'VTZ', 'name': 'Visakhapatnam Airport'},
+                'airline': 'IndiGo',
+                'flight_number': '6E 2189',
+                'departure_time': '08:15 AM',
+                'arrival_time': '10:35 AM',
+                'duration': '140 minutes',
+                'aircraft': 'Airbus A321neo',
+                'stops': 0
+            }
+        ],
+        'price': 170,
+        'type': 'Direct'
+    },
+    {
+        'flights': [
+            {
+                'departure_airport': {'id': 'BBI', 'name': 'Biju Patnaik International Airport'},
+                'arrival_airport': {'id': 'VTZ', 'name': 'Visakhapatnam Airport'},
+                'airline': 'IndiGo',
+                'flight_number': '6E 2304',
+                'departure_time': '02:45 PM',
+                'arrival_time': '05:20 PM',
+                'duration': '155 minutes',
+                'aircraft': 'Airbus A320',
+                'stops': 0
+            }
+        ],
+        'price': 170,
+        'type': 'Direct'
+    },
+    {
+        'flights': [
+            {
+                'departure_airport': {'id': 'BBI', 'name': 'Biju Patnaik International Airport'},
+                'arrival_airport': {'id': 'VTZ', 'name': 'Visakhapatnam Airport'},
+                'airline': 'IndiGo',
+                'flight_number': '6E 459',
+                'departure_time': '07:30 PM',
+                'arrival_time': '10:05 PM',
+                'duration': '155 minutes',
+                'aircraft': 'Airbus A320neo',
+                'stops': 0
+            }
+        ],
+        'price': 170,
+        'type': 'Direct'
+    },
+    {
+        'flights': [
+            {
+                'departure_airport': {'id': 'BBI', 'name': 'Biju Patnaik International Airport'},
+                'arrival_airport': {'id': 'VTZ', 'name': 'Visakhapatnam Airport'},
+                'airline': 'Air India Express',
+                'flight_number': 'IX 1243',
+                'departure_time': '11:20 AM',
+                'arrival_time': '01:55 PM',
+                'duration': '155 minutes',
+                'aircraft': 'Boeing 737-800',
+                'stops': 0
+            }
+        ],
+        'price': 185,
+        'type': 'Direct'
+    }
+)
+
+# Subset of _SAMPLE_FLIGHTS served when the SerpAPI call fails
+_FALLBACK_SAMPLE_INDEXES = (0, 1, 4)
+
+# Failures of a SerpAPI call that should fall back to sample data
+_SEARCH_ERRORS = (serpapi.SerpApiError, requests.RequestException, TimeoutError, json.JSONDecodeError)
+
+# SerpAPI 24-hour time of day, e.g. "12:35"
+_TIME_RE = re.compile(r'(\d{1,2}):(\d{2})')
+
+
+def _transform_flight_option(flight_option):
+    """Transform a single SerpAPI flight option, or return None if it can't be used"""
+    # Get the main flight segments
+    flights = flight_option.get('flights')
+    if not flights:
+        return None
+
+    try:
+        # For multi-segment flights, we'll focus on the first segment for display
+        main_flight = flights[0]
+        get = main_flight.get
+        
+        # Extract departure and arrival info
+        departure_airport = get('departure_airport', {})
+        arrival_airport = flights[-1].get('arrival_airport', {})  # Use last segment for final destination
+        
+        # Convert time format from "2025-10-01 12:35" to "12:35 PM"
+        departure_time = _format_serpapi_time(departure_airport.get('time', 'Unknown'))
+        arrival_time = _format_serpapi_time(arrival_airport.get('time', 'Unknown'))
+        
+        # Calculate total duration
+        total_duration = flight_option.get('total_duration', get('duration', 0))
+        duration_str = f"{total_duration} minutes" if total_duration else "Unknown"
+        
+        # Determine number of stops
+        stops = len(flight_option.get('layovers', ()))
+        
+        return {
+            'flights': [
+                {
+                    'departure_airport': {
+                        'id': departure_airport.get('id', 'Unknown'),
+                        'name': departure_airport.get('name', 'Unknown')
+                    },
+                    'arrival_airport': {
+                        'id': arrival_airport.get('id', 'Unknown'),
+                        'name': arrival_airport.get('name', 'Unknown')
+                    },
+                    'airline': get('airline', 'Unknown'),
+                    'flight_number': get('flight_number', 'Unknown'),
+                    'departure_time': departure_time,
+                    'arrival_time': arrival_time,
+                    'duration': duration_str,
+                    'aircraft': get('airplane', 'Unknown'),
+                    'stops': stops
+                }
+            ],
+            'price': flight_option.get('price', 'N/A'),
+            'type': 'Direct' if stops == 0 else f'{stops} stop{"s" if stops > 1 else ""}'
+        }
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return None
+
+
+def _format_serpapi_time(timestamp):
+    """Reduce a SerpAPI "YYYY-MM-DD HH:MM" timestamp to a 12-hour time of day"""
+    if timestamp != 'Unknown' and ' ' in timestamp:
+        return format_time_12hour(timestamp.split(' ')[1])
+    return timestamp
 
 
 def format_time_12hour(time_24):
     """Convert 24-hour time to 12-hour format with AM/PM"""
-    try:
-        from datetime import datetime
-        time_obj = datetime.strptime(time_24, '%H:%M')
-        return time_obj.strftime('%I:%M %p').lstrip('0')
-    except:
+    match = _TIME_RE.fullmatch(time_24) if isinstance(time_24, str) else None
+    if not match:
+        return time_24
+    hour, minute = int(match.group(1)), match.group(2)
+    if hour > 23 or int(minute) > 59:
         return time_24
+    return f"{hour % 12 or 12}:{minute} {'AM' if hour < 12 else 'PM'}"
 
 
 class FlightsInput(BaseModel):
     departure_location: Optional[str] = Field(description='Departure city name or airport code (will be automatically converted to IATA code)')
     arrival_location: Optional[str] = Field(description='Arrival city name or airport code (will be automatically converted to IATA code)')
     outbound_date: Optional[str] = Field(description='Parameter defines the outbound date. The format is YYYY-MM-DD. e.g. 2024-06-22')
-    return_date: Optional[str] = Field(description='Parameter defines the return date for round-trip flights. Leave empty for one-way flights. The format is YYYY-MM-DD. e.g. 2024-06-28')
+    return_date: Optional[str] = Field(None, description='Parameter defines the return date for round-trip flights. Leave empty for one-way flights. The format is YYYY-MM-DD. e.g. 2024-06-28')
     adults: Optional[int] = Field(1, description='Parameter defines the number of adults. Default to 1.')
     children: Optional[int] = Field(0, description='Parameter defines the number of children. Default to 0.')
     infants_in_seat: Optional[int] = Field(0, description='Parameter defines the number of infants in seat. Default to 0.')
     infants_on_lap: Optional[int] = Field(0, description='Parameter defines the number of infants on lap. Default to 0.')
 
+    # Reject malformed or past dates here so bad queries never reach SerpAPI
+    @field_validator('outbound_date', 'return_date')
+    @classmethod
+    def check_date(cls, value):
+        return validate_travel_date(value)
+
+    @model_validator(mode='after')
+    def check_return_after_outbound(self):
+        if (self.outbound_date and self.return_date and self.return_date.strip()
+                and datetime.date.fromisoformat(self.return_date) < datetime.date.fromisoformat(self.outbound_date)):
+            raise ValueError('return_date must not be before outbound_date')
+        return self
+
 
 class FlightsInputSchema(BaseModel):
     params: FlightsInput
 
 
-@tool(args_schema=FlightsInputSchema)
-def flights_finder(params: FlightsInput):
-    '''
-    Find flights using the Google Flights engine.
-    Automatically converts city names to IATA airport codes.
+def _airport_code(location):
+    """Resolve a location to an airport code, memoized on the whitespace-trimmed input"""
+    if not location:
+        return None
+    # Case is kept: only uppercase input like "JFK" takes the airport-code fast path
+    return _cached_airport_code(location.strip())
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_airport_code(location):
+    return city_standardizer.get_airport_code(location)
+
+
+@functools.lru_cache(maxsize=1)
+def _base_search_params():
+    """
+    Search parameters that only depend on the environment, read once on first use.
+    Call _base_search_params.cache_clear() after changing the related env vars at runtime.
+    """
+    return {
+        'api_key': get_env_var('SERPAPI_API_KEY'),
+        'engine': 'google_flights',
+        'currency': get_env_var('CURRENCY', 'USD'),
+        'hl': get_env_var('SERPAPI_HL', 'en'),  # Language
+        'gl': get_env_var('SERPAPI_GL', 'us'),  # Country
+    }
+
+
+def _prepare_search(params: FlightsInput):
+    """
+    Resolve airport codes and build the SerpAPI search parameters.
 
     Returns:
-        dict: Flight search results.
-    '''
-    
-    # Initialize the city standardizer
-    standardizer = CityStandardizer()
-    
+        Tuple of (search_params, error); error is set when a location could not be resolved
+    """
     # Convert locations to airport codes
-    departure_airport = standardizer.get_airport_code(params.departure_location)
-    arrival_airport = standardizer.get_airport_code(params.arrival_location)
+    departure_airport = _airport_code(params.departure_location)
+    arrival_airport = _airport_code(params.arrival_location)
     
     # Validate that we have valid airport codes
     if not departure_airport:
-        return {
+        return None, {
             'error': f'Could not find airport code for departure location: {params.departure_location}',
             'flights': []
         }
     
     if not arrival_airport:
-        return {
+        return None, {
             'error': f'Could not find airport code for arrival location: {params.arrival_location}',
             'flights': []
         }
 
     search_params = {
-        'api_key': get_env_var('SERPAPI_API_KEY'),
-        'engine': 'google_flights',
+        **_base_search_params(),
         'departure_id': departure_airport,
         'arrival_id': arrival_airport,
         'outbound_date': params.outbound_date,
-        'currency': get_env_var('CURRENCY', 'USD'),
-        'hl': 'en',  # Language
-        'gl': 'us',  # Country
         'adults': params.adults,
         'children': params.children,
         'infants_in_seat': params.infants_in_seat,
-        'infants_on_lap': params.infants_on_lap
+        'infants_on_lap': params.infants_on_lap,
+        # Trim both lists server-side; options past the limit would only be parsed and thrown away
+        'json_restrictor': f'best_flights[0:{FLIGHTS_RESULT_LIMIT}],other_flights[0:{FLIGHTS_RESULT_LIMIT}]'
     }
     
     # Set flight type and return_date based on whether return_date is provided
@@ -166,167 +294,82 @@ def flights_finder(params: FlightsInput):
     else:
         search_params['type'] = '2'  # One way
 
+    return search_params, None
+
+
+def _flights_from_data(data, departure_airport, arrival_airport):
+    """
+    Transform a SerpAPI response into flight results, falling back to sample data.
+
+    Returns:
+        Tuple of (results, is_sample); sample results must not be cached
+    """
+    # Walk best_flights then other_flights, stopping once enough usable options are found
+    all_flights = itertools.chain(data.get('best_flights', ()), data.get('other_flights', ()))
+    results = list(itertools.islice(
+        filter(None, map(_transform_flight_option, all_flights)), FLIGHTS_RESULT_LIMIT))
+    
+    # If no results from API, provide sample data for demonstration
+    if not results:
+        logger.debug('No flights found from API, providing sample data')
+        return _sample_flights(departure_airport, arrival_airport), True
+    
+    return results, False
+
+
+def _sample_flights(departure_airport, arrival_airport, indexes=None):
+    """
+    Copy sample flights from _SAMPLE_FLIGHTS, patched with the resolved airport codes.
+
+    Args:
+        departure_airport: Resolved departure airport code
+        arrival_airport: Resolved arrival airport code
+        indexes: Optional subset of _SAMPLE_FLIGHTS to return, all entries by default
+
+    Returns:
+        List of flights in expected format
+    """
+    templates = _SAMPLE_FLIGHTS if indexes is None else [_SAMPLE_FLIGHTS[i] for i in indexes]
+    results = copy.deepcopy(list(templates))
+    for flight_option in results:
+        segment = flight_option['flights'][0]
+        if departure_airport:
+            segment['departure_airport']['id'] = departure_airport
+        if arrival_airport:
+            segment['arrival_airport']['id'] = arrival_airport
+    return results
+
+
+@tool(args_schema=FlightsInputSchema)
+def flights_finder(params: FlightsInput):
+    '''
+    Find flights using the Google Flights engine.
+    Automatically converts city names to IATA airport codes.
+
+    Returns:
+        dict: Flight search results.
+    '''
+    search_params, error = _prepare_search(params)
+    if error:
+        return error
+    departure_airport, arrival_airport = search_params['departure_id'], search_params['arrival_id']
+
+    key = cache_key(search_params)
+    results = get_cached(key)
+    if results is not None:
+        return results
+
     try:
-        safe_params = dict(search_params)
-        if 'api_key' in safe_params:
-            safe_params['api_key'] = '***'
-        search = serpapi.search(search_params)
-        data = dict(search) if search else {}
-        
-        # Get both best_flights and other_flights
-        best_flights = data.get('best_flights', [])
-        other_flights = data.get('other_flights', [])
-        all_flights = best_flights + other_flights
-        
-        # Transform SerpAPI format to expected format
-        if all_flights:
-            results = transform_serpapi_flights(all_flights)
-        else:
-            results = []
-        
-        # If no results from API, provide sample data for demonstration
-        if not results:
-            print("DEBUG: No flights found from API, providing sample data")
-            results = [
-                {
-                    'flights': [
-                        {
-                            'departure_airport': {'id': departure_airport or 'BBI', 'name': 'Biju Patnaik International Airport'},
-                            'arrival_airport': {'id': arrival_airport or 'VTZ', 'name': 'Visakhapatnam Airport'},
-                            'airline': 'IndiGo',
-                            'flight_number': '6E 6214',
-                            'departure_time': '06:30 AM',
-                            'arrival_time': '07:50 AM',
-                            'duration': '80 minutes',
-                            'aircraft': 'Airbus A320neo',
-                            'stops': 0
-                        }
-                    ],
-                    'price': 168,
-                    'type': 'Direct'
-                },
-                {
-                    'flights': [
-                        {
-                            'departure_airport': {'id': departure_airport or 'BBI', 'name': 'Biju Patnaik International Airport'},
-                            'arrival_airport': {'id': arrival_airport or 'VTZ', 'name': 'Visakhapatnam Airport'},
-                            'airline': 'IndiGo',
-                            'flight_number': '6E 2189',
-                            'departure_time': '08:15 AM',
-                            'arrival_time': '10:35 AM',
-                            'duration': '140 minutes',
-                            'aircraft': 'Airbus A321neo',
-                            'stops': 0
-                        }
-                    ],
-                    'price': 170,
-                    'type': 'Direct'
-                },
-                {
-                    'flights': [
-                        {
-                            'departure_airport': {'id': departure_airport or 'BBI', 'name': 'Biju Patnaik International Airport'},
-                            'arrival_airport': {'id': arrival_airport or 'VTZ', 'name': 'Visakhapatnam Airport'},
-                            'airline': 'IndiGo',
-                            'flight_number': '6E 2304',
-                            'departure_time': '02:45 PM',
-                            'arrival_time': '05:20 PM',
-                            'duration': '155 minutes',
-                            'aircraft': 'Airbus A320',
-                            'stops': 0
-                        }
-                    ],
-                    'price': 170,
-                    'type': 'Direct'
-                },
-                {
-                    'flights': [
-                        {
-                            'departure_airport': {'id': departure_airport or 'BBI', 'name': 'Biju Patnaik International Airport'},
-                            'arrival_airport': {'id': arrival_airport or 'VTZ', 'name': 'Visakhapatnam Airport'},
-                            'airline': 'IndiGo',
-                            'flight_number': '6E 459',
-                            'departure_time': '07:30 PM',
-                            'arrival_time': '10:05 PM',
-                            'duration': '155 minutes',
-                            'aircraft': 'Airbus A320neo',
-                            'stops': 0
-                        }
-                    ],
-                    'price': 170,
-                    'type': 'Direct'
-                },
-                {
-                    'flights': [
-                        {
-                            'departure_airport': {'id': departure_airport or 'BBI', 'name': 'Biju Patnaik International Airport'},
-                            'arrival_airport': {'id': arrival_airport or 'VTZ', 'name': 'Visakhapatnam Airport'},
-                            'airline': 'Air India Express',
-                            'flight_number': 'IX 1243',
-                            'departure_time': '11:20 AM',
-                            'arrival_time': '01:55 PM',
-                            'duration': '155 minutes',
-                            'aircraft': 'Boeing 737-800',
-                            'stops': 0
-                        }
-                    ],
-                    'price': 185,
-                    'type': 'Direct'
-                }
-            ]
-    except Exception as e:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Flight search params: %s', {**search_params, 'api_key': '***'})
+        data = serp_get(search_params) or {}
+        results, is_sample = _flights_from_data(data, departure_airport, arrival_airport)
+    except _SEARCH_ERRORS as e:
         # Provide sample data when API fails
-        results = [
-            {
-                'flights': [
-                    {
-                    'departure_airport': {'id': departure_airport or 'BBI', 'name': 'Biju Patnaik International Airport'},
-                    'arrival_airport': {'id': arrival_airport or 'VTZ', 'name': 'Visakhapatnam Airport'},
-                        'airline': 'IndiGo',
-                        'flight_number': '6E 6214',
-                        'departure_time': '06:30 AM',
-                        'arrival_time': '07:50 AM',
-                        'duration': '80 minutes',
-                        'aircraft': 'Airbus A320neo',
-                        'stops': 0
-                    }
-                ],
-                'price': 168,
-                'type': 'Direct'
-            },
-            {
-                'flights': [
-                    {
-                    'departure_airport': {'id': departure_airport or 'BBI', 'name': 'Biju Patnaik International Airport'},
-                    'arrival_airport': {'id': arrival_airport or 'VTZ', 'name': 'Visakhapatnam Airport'},
-                        'airline': 'IndiGo',
-                        'flight_number': '6E 2189',
-                        'departure_time': '08:15 AM',
-                        'arrival_time': '10:35 AM',
-                        'duration': '140 minutes',
-                        'aircraft': 'Airbus A321neo',
-                        'stops': 0
-                    }
-                ],
-                'price': 170,
-                'type': 'Direct'
-            },
-            {
-                'flights': [
-                    {
-                    'departure_airport': {'id': departure_airport or 'BBI', 'name': 'Biju Patnaik International Airport'},
-                    'arrival_airport': {'id': arrival_airport or 'VTZ', 'name': 'Visakhapatnam Airport'},
-                        'airline': 'Air India Express',
-                        'flight_number': 'IX 1243',
-                        'departure_time': '11:20 AM',
-                        'arrival_time': '01:55 PM',
-                        'duration': '155 minutes',
-                        'aircraft': 'Boeing 737-800',
-                        'stops': 0
-                    }
-                ],
-                'price': 185,
-                'type': 'Direct'
-            }
-        ]
+        logger.warning('SerpAPI flight search failed, serving sample flights: %s', e)
+        return _sample_flights(departure_airport, arrival_airport, _FALLBACK_SAMPLE_INDEXES)
+    # An empty response may be transient, so never pin the demo data in the cache
+    if not is_sample:
+        set_cached(key, results)
     return results
+
@@ -1,11 +1,100 @@
-import os
+import datetime
+import functools
+import json
+import logging
+import re
 from typing import Optional
 
+import requests
 import serpapi
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from langchain_core.tools import tool
+from agents.utils.date_utils import validate_travel_date
 from agents.utils.env_utils import get_env_var
-from agents.utils.city_standardizer import CityStandardizer
+from agents.utils.city_standardizer import city_standardizer
+from agents.tools._http import serp_get
+from agents.tools._result_cache import cache_key, get_cached, set_cached
+
+
+logger = logging.getLogger(__name__)
+
+# Number of hotels returned to the agent
+HOTELS_RESULT_LIMIT = 5
+
+# Keywords in nearby airport names that identify the hotel's city (add more cities as needed)
+_AIRPORT_CITY_KEYWORDS = {
+    'Mumbai': 'Mumbai',
+    'Bombay': 'Mumbai',
+    'Delhi': 'Delhi',
+    'Bangalore': 'Bangalore',
+    'Bengaluru': 'Bangalore',
+}
+_AIRPORT_CITY_RE = re.compile('|'.join(map(re.escape, _AIRPORT_CITY_KEYWORDS)))
+
+# Approximate city bounding boxes: (city, min_lat, max_lat, min_lng, max_lng)
+_CITY_BOUNDS = (
+    ('Mumbai', 18.8, 19.3, 72.7, 73.1),
+    ('Delhi', 28.4, 28.9, 76.8, 77.5),
+    ('Bangalore', 12.8, 13.2, 77.4, 77.8),
+)
+
+# Fields every returned hotel must have, with placeholders for the ones SerpAPI omits
+_HOTEL_DEFAULTS = {
+    'rate_per_night': {'lowest': 'Price not available', 'currency': 'USD'},
+    'hotel_class': 'Not specified',
+    'distance_from_search_location': 'Distance not available',
+}
+
+# Property fields passed on to the agent and the API; the rest of the SerpAPI blob
+# (property tokens, detail links, image galleries, review breakdowns...) is dropped
+_HOTEL_FIELDS = (
+    'name', 'type', 'description', 'link', 'overall_rating', 'reviews', 'location_rating',
+    'rate_per_night', 'total_rate', 'hotel_class', 'check_in_time', 'check_out_time',
+    'distance_from_search_location', 'amenities', 'images',
+)
+
+# Sample hotels served when the API has no results or fails: (location suffix, hotel)
+_SAMPLE_HOTELS = (
+    (' City Center', {
+        'name': 'Grand Plaza Hotel',
+        'rate_per_night': {'lowest': '$150', 'currency': 'USD'},
+        'overall_rating': 4.5,
+        'reviews': 1250,
+        'amenities': ['Free WiFi', 'Pool', 'Gym', 'Restaurant'],
+        'hotel_class': 4,
+        'distance_from_search_location': '0.5 miles from city center',
+        'images': ['https://example.com/hotel1.jpg'],
+        'link': 'https://booking.example.com/grand-plaza-hotel',
+        'type': 'Hotel'
+    }),
+    (' Downtown', {
+        'name': 'City Center Inn',
+        'rate_per_night': {'lowest': '$89', 'currency': 'USD'},
+        'overall_rating': 4.2,
+        'reviews': 890,
+        'amenities': ['Free WiFi', 'Breakfast', 'Business Center'],
+        'hotel_class': 3,
+        'distance_from_search_location': '0.8 miles from city center',
+        'images': ['https://example.com/hotel2.jpg'],
+        'link': 'https://booking.example.com/city-center-inn',
+        'type': 'Inn'
+    }),
+    (' Waterfront', {
+        'name': 'Luxury Resort & Spa',
+        'rate_per_night': {'lowest': '$280', 'currency': 'USD'},
+        'overall_rating': 4.8,
+        'reviews': 2100,
+        'amenities': ['Spa', 'Pool', 'Fine Dining', 'Concierge'],
+        'hotel_class': 5,
+        'distance_from_search_location': '2.1 miles from city center',
+        'images': ['https://example.com/hotel3.jpg'],
+        'link': 'https://booking.example.com/luxury-resort-spa',
+        'type': 'Resort'
+    }),
+)
+
+# Failures of a SerpAPI call that should fall back to sample data
+_SEARCH_ERRORS = (serpapi.SerpApiError, requests.RequestException, TimeoutError, json.JSONDecodeError)
 
 
 class HotelsInput(BaseModel):
@@ -19,42 +108,57 @@ class HotelsInput(BaseModel):
     hotel_class: Optional[str] = Field(
         None, description='Parameter defines to include only certain hotel class in the results. for example- 2,3,4')
 
+    # Reject malformed or past dates here so bad queries never reach SerpAPI
+    @field_validator('check_in_date', 'check_out_date')
+    @classmethod
+    def check_date(cls, value):
+        return validate_travel_date(value)
 
-class HotelsInputSchema(BaseModel):
-    params: HotelsInput
+    @model_validator(mode='after')
+    def check_out_after_check_in(self):
+        if datetime.date.fromisoformat(self.check_out_date) <= datetime.date.fromisoformat(self.check_in_date):
+            raise ValueError('check_out_date must be after check_in_date')
+        return self
 
 
-@tool(args_schema=HotelsInputSchema)
-def hotels_finder(params: HotelsInput):
-    '''
-    Find hotels using the Google Hotels engine.
-    Automatically standardizes city names for consistent search results.
+class HotelsInputSchema(BaseModel):
+    params: HotelsInput
 
-    Returns:
-        dict: Hotel search results.
-    '''
-    
-    # Initialize the city standardizer
-    standardizer = CityStandardizer()
-    
-    # Standardize the location input
-    location_info = standardizer.standardize_location_input(params.location)
-    standardized_location = location_info['canonical_name'] or location_info['normalized'] or params.location
 
-    search_params = {
+@functools.lru_cache(maxsize=1)
+def _base_search_params():
+    """
+    Search parameters that only depend on the environment, read once on first use.
+    Call _base_search_params.cache_clear() after changing the related env vars at runtime.
+    """
+    return {
         'api_key': get_env_var('SERPAPI_API_KEY'),
         'engine': 'google_hotels',
         'hl': get_env_var('SERPAPI_HL', 'en'),
         'gl': get_env_var('SERPAPI_GL', 'us'),
+        'currency': get_env_var('CURRENCY', 'USD'),
+    }
+
+
+def _build_search_params(params: HotelsInput):
+    """Standardize the location and build the SerpAPI search parameters"""
+    # Standardize the location input
+    location_info = city_standardizer.standardize_location_input(params.location)
+    standardized_location = location_info.canonical_name or location_info.normalized or params.location
+
+    search_params = {
+        **_base_search_params(),
         'q': standardized_location,
         'check_in_date': params.check_in_date,
         'check_out_date': params.check_out_date,
-        'currency': get_env_var('CURRENCY', 'USD'),
         'adults': params.adults,
         'children': params.children,
         'rooms': params.rooms,
         'sort_by': params.sort_by,
-        'hotel_class': params.hotel_class
+        'hotel_class': params.hotel_class,
+        # Have SerpAPI trim the response server-side, with headroom for the nameless/priceless
+        # rows _hotels_from_data drops before slicing to HOTELS_RESULT_LIMIT
+        'json_restrictor': f'properties[0:{HOTELS_RESULT_LIMIT * 2}]'
     }
 
     # Allow runtime override from sidebar settings
@@ -62,150 +166,91 @@ def hotels_finder(params: HotelsInput):
     if override_sort:
         search_params['sort_by'] = override_sort
 
-    def extract_location_info(hotel_data, search_location):
-        """Extract location information from hotel data"""
-        # Try to get location from nearby places
-        nearby_places = hotel_data.get('nearby_places', [])
-        if nearby_places:
-            # Look for airport or landmark to determine area
-            for place in nearby_places:
-                place_name = place.get('name', '')
-                if 'Airport' in place_name or 'International' in place_name:
-                    # Extract city name from airport
-                    if 'Mumbai' in place_name or 'Bombay' in place_name:
-                        return 'Mumbai'
-                    elif 'Delhi' in place_name:
-                        return 'Delhi'
-                    elif 'Bangalore' in place_name or 'Bengaluru' in place_name:
-                        return 'Bangalore'
-                    # Add more cities as needed
+    return search_params
+
+
+def extract_location_info(hotel_data, search_location):
+    """Extract location information from hotel data"""
+    # Try to get location from nearby places
+    nearby_places = hotel_data.get('nearby_places', [])
+    if nearby_places:
+        # Look for airport or landmark to determine area
+        for place in nearby_places:
+            place_name = place.get('name', '')
+            if 'Airport' in place_name or 'International' in place_name:
+                # Extract city name from airport
+                match = _AIRPORT_CITY_RE.search(place_name)
+                if match:
+                    return _AIRPORT_CITY_KEYWORDS[match.group()]
+    
+    # Try to extract from GPS coordinates (basic area detection)
+    gps = hotel_data.get('gps_coordinates', {})
+    if gps:
+        lat = gps.get('latitude', 0)
+        lng = gps.get('longitude', 0)
         
-        # Try to extract from GPS coordinates (basic area detection)
-        gps = hotel_data.get('gps_coordinates', {})
-        if gps:
-            lat = gps.get('latitude', 0)
-            lng = gps.get('longitude', 0)
-            
-            # Mumbai coordinates range (approximate)
-            if 18.8 <= lat <= 19.3 and 72.7 <= lng <= 73.1:
-                return 'Mumbai'
-            # Delhi coordinates range (approximate)
-            elif 28.4 <= lat <= 28.9 and 76.8 <= lng <= 77.5:
-                return 'Delhi'
-            # Bangalore coordinates range (approximate)
-            elif 12.8 <= lat <= 13.2 and 77.4 <= lng <= 77.8:
-                return 'Bangalore'
+        for city, min_lat, max_lat, min_lng, max_lng in _CITY_BOUNDS:
+            if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
+                return city
+    
+    # Fallback to search location
+    return search_location
+
+
+def _hotels_from_data(data, location):
+    """Annotate SerpAPI hotel properties, falling back to sample data; returns (results, is_sample)"""
+    # Rows with neither a name nor a price would only render as placeholder cards, so drop them
+    # like unusable flight options; only the hotels we return are post-processed
+    top = [hotel for hotel in data.get('properties', ()) if hotel.get('name') or hotel.get('rate_per_night')]
+    top = top[:HOTELS_RESULT_LIMIT]
+    
+    # Process real API data and add location information
+    if top:
+        for i, hotel in enumerate(top):
+            # Keep only the fields we use, filling in missing ones from the defaults
+            projected = {**_HOTEL_DEFAULTS, **{k: hotel[k] for k in _HOTEL_FIELDS if k in hotel}}
+            # Only the first image is displayed
+            if projected.get('images'):
+                projected['images'] = projected['images'][:1]
+            projected['location'] = extract_location_info(hotel, location)
+            top[i] = projected
         
-        # Fallback to search location
-        return search_location
+        return top, False
+    
+    # If no results from API, provide sample data for demonstration
+    return _sample_hotels(location), True
+
+
+def _sample_hotels(location):
+    """Sample data returned when the API has no results or fails"""
+    # Shallow copies: the nested amenities/images lists are shared and only ever read
+    return [{**hotel, 'location': f'{location}{suffix}'} for suffix, hotel in _SAMPLE_HOTELS]
+
+
+@tool(args_schema=HotelsInputSchema)
+def hotels_finder(params: HotelsInput):
+    '''
+    Find hotels using the Google Hotels engine.
+    Automatically standardizes city names for consistent search results.
+
+    Returns:
+        dict: Hotel search results.
+    '''
+    search_params = _build_search_params(params)
+    key = cache_key({**search_params, 'location': params.location})
+    results = get_cached(key)
+    if results is not None:
+        return results
 
     try:
-        search = serpapi.search(search_params)
-        data = getattr(search, 'data', {}) or {}
-        properties = data.get('properties', [])
-        
-        # Process real API data and add location information
-        if properties:
-            for hotel in properties:
-                # Add location information to each hotel
-                hotel['location'] = extract_location_info(hotel, params.location)
-                
-                # Ensure rate_per_night structure exists
-                if 'rate_per_night' not in hotel:
-                    hotel['rate_per_night'] = {'lowest': 'Price not available', 'currency': 'USD'}
-                
-                # Ensure other required fields exist
-                if 'hotel_class' not in hotel:
-                    hotel['hotel_class'] = 'Not specified'
-                if 'distance_from_search_location' not in hotel:
-                    hotel['distance_from_search_location'] = 'Distance not available'
-            
-            return properties[:5]
-        
-        # If no results from API, provide sample data for demonstration
-        else:
-            properties = [
-                {
-                    'name': 'Grand Plaza Hotel',
-                    'location': f'{params.location} City Center',
-                    'rate_per_night': {'lowest': '$150', 'currency': 'USD'},
-                    'overall_rating': 4.5,
-                    'reviews': 1250,
-                    'amenities': ['Free WiFi', 'Pool', 'Gym', 'Restaurant'],
-                    'hotel_class': 4,
-                    'distance_from_search_location': '0.5 miles from city center',
-                    'images': ['https://example.com/hotel1.jpg'],
-                    'link': 'https://booking.example.com/grand-plaza-hotel',
-                    'type': 'Hotel'
-                },
-                {
-                    'name': 'City Center Inn',
-                    'location': f'{params.location} Downtown',
-                    'rate_per_night': {'lowest': '$89', 'currency': 'USD'},
-                    'overall_rating': 4.2,
-                    'reviews': 890,
-                    'amenities': ['Free WiFi', 'Breakfast', 'Business Center'],
-                    'hotel_class': 3,
-                    'distance_from_search_location': '0.8 miles from city center',
-                    'images': ['https://example.com/hotel2.jpg'],
-                    'link': 'https://booking.example.com/city-center-inn',
-                    'type': 'Inn'
-                },
-                {
-                    'name': 'Luxury Resort & Spa',
-                    'location': f'{params.location} Waterfront',
-                    'rate_per_night': {'lowest': '$280', 'currency': 'USD'},
-                    'overall_rating': 4.8,
-                    'reviews': 2100,
-                    'amenities': ['Spa', 'Pool', 'Fine Dining', 'Concierge'],
-                    'hotel_class': 5,
-                    'distance_from_search_location': '2.1 miles from city center',
-                    'images': ['https://example.com/hotel3.jpg'],
-                    'link': 'https://booking.example.com/luxury-resort-spa',
-                    'type': 'Resort'
-                }
-            ]
-            return properties[:5]
-    except serpapi.SerpApiError as e:
+        data = serp_get(search_params) or {}
+        results, is_sample = _hotels_from_data(data, params.location)
+    except _SEARCH_ERRORS as e:
         # Provide sample data when API fails
-        return [
-            {
-                'name': 'Grand Plaza Hotel',
-                'location': f'{params.location} City Center',
-                'rate_per_night': {'lowest': '$150', 'currency': 'USD'},
-                'overall_rating': 4.5,
-                'reviews': 1250,
-                'amenities': ['Free WiFi', 'Pool', 'Gym', 'Restaurant'],
-                'hotel_class': 4,
-                'distance_from_search_location': '0.5 miles from city center',
-                'images': ['https://example.com/hotel1.jpg'],
-                'link': 'https://booking.example.com/grand-plaza-hotel',
-                'type': 'Hotel'
-            },
-            {
-                'name': 'City Center Inn',
-                'location': f'{params.location} Downtown',
-                'rate_per_night': {'lowest': '$89', 'currency': 'USD'},
-                'overall_rating': 4.2,
-                'reviews': 890,
-                'amenities': ['Free WiFi', 'Breakfast', 'Business Center'],
-                'hotel_class': 3,
-                'distance_from_search_location': '0.8 miles from city center',
-                'images': ['https://example.com/hotel2.jpg'],
-                'link': 'https://booking.example.com/city-center-inn',
-                'type': 'Inn'
-            },
-            {
-                'name': 'Luxury Resort & Spa',
-                'location': f'{params.location} Waterfront',
-                'rate_per_night': {'lowest': '$280', 'currency': 'USD'},
-                'overall_rating': 4.8,
-                'reviews': 2100,
-                'amenities': ['Spa', 'Pool', 'Fine Dining', 'Concierge'],
-                'hotel_class': 5,
-                'distance_from_search_location': '2.1 miles from city center',
-                'images': ['https://example.com/hotel3.jpg'],
-                'link': 'https://booking.example.com/luxury-resort-spa',
-                'type': 'Resort'
-            }
-        ]
+        logger.warning('SerpAPI hotel search failed, serving sample hotels: %s', e)
+        return _sample_hotels(params.location)
+    # Sample hotels stand in for an empty response, which may only be transient
+    if not is_sample:
+        set_cached(key, results)
+    return results
+
@@ -5,250 +5,331 @@ This module provides comprehensive city name standardization and airport code ma
 to ensure consistent formatting across all search operations.
 """
 
+import functools
 import re
-from typing import Dict, Optional, Tuple
-from difflib import get_close_matches
+from dataclasses import asdict, dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+from rapidfuzz import fuzz, process
+
+
+# Normalization patterns
+_NON_WORD_RE = re.compile(r'[^\w\s\-\']')
+_MULTI_SPACE_RE = re.compile(r'\s+')
+_AIRPORT_CODE_RE = re.compile(r'^[A-Z]{3}$')
+
+# Comprehensive city to airport code mapping
+_CITY_TO_AIRPORT = MappingProxyType({
+    # Major African Cities
+    'durban': 'DUR',
+    'harare': 'HRE',
+    'cape town': 'CPT',
+    'capetown': 'CPT',
+    'johannesburg': 'JNB',
+    'joburg': 'JNB',
+    'jburg': 'JNB',
+    'cairo': 'CAI',
+    'lagos': 'LOS',
+    'nairobi': 'NBO',
+    'casablanca': 'CMN',
+    'addis ababa': 'ADD',
+    'dar es salaam': 'DAR',
+    'accra': 'ACC',
+    'tunis': 'TUN',
+    'algiers': 'ALG',
+    'kigali': 'KGL',
+    'lusaka': 'LUN',
+    'maputo': 'MPM',
+    'windhoek': 'WDH',
+    'gaborone': 'GBE',
+    'maseru': 'MSU',
+    'mbabane': 'MTS',
+    'blantyre': 'BLZ',
+    'lilongwe': 'LLW',
+    
+    # Major International Cities
+    'london': 'LHR',
+    'paris': 'CDG',
+    'new york': 'JFK',
+    'newyork': 'JFK',
+    'nyc': 'JFK',
+    'los angeles': 'LAX',
+    'losangeles': 'LAX',
+    'chicago': 'ORD',
+    'miami': 'MIA',
+    'toronto': 'YYZ',
+    'vancouver': 'YVR',
+    'sydney': 'SYD',
+    'melbourne': 'MEL',
+    'tokyo': 'NRT',
+    'beijing': 'PEK',
+    'shanghai': 'PVG',
+    'hong kong': 'HKG',
+    'hongkong': 'HKG',
+    'singapore': 'SIN',
+    'bangkok': 'BKK',
+    'mumbai': 'BOM',
+    'delhi': 'DEL',
+    'new delhi': 'DEL',
+    'newdelhi': 'DEL',
+    'dubai': 'DXB',
+    'doha': 'DOH',
+    'istanbul': 'IST',
+    'moscow': 'SVO',
+    'amsterdam': 'AMS',
+    'frankfurt': 'FRA',
+    'zurich': 'ZUR',
+    'madrid': 'MAD',
+    'barcelona': 'BCN',
+    'rome': 'FCO',
+    'milan': 'MXP',
+    'vienna': 'VIE',
+    'brussels': 'BRU',
+    'stockholm': 'ARN',
+    'oslo': 'OSL',
+    'copenhagen': 'CPH',
+    'helsinki': 'HEL',
+    'athens': 'ATH',
+    'lisbon': 'LIS',
+    'dublin': 'DUB',
+    'edinburgh': 'EDI',
+    'manchester': 'MAN',
+    'birmingham': 'BHX',
+    'glasgow': 'GLA',
+    
+    # US Cities
+    'atlanta': 'ATL',
+    'boston': 'BOS',
+    'dallas': 'DFW',
+    'denver': 'DEN',
+    'detroit': 'DTW',
+    'houston': 'IAH',
+    'las vegas': 'LAS',
+    'lasvegas': 'LAS',
+    'vegas': 'LAS',
+    'minneapolis': 'MSP',
+    'orlando': 'MCO',
+    'philadelphia': 'PHL',
+    'phoenix': 'PHX',
+    'portland': 'PDX',
+    'san francisco': 'SFO',
+    'sanfrancisco': 'SFO',
+    'seattle': 'SEA',
+    'washington': 'DCA',
+    'washington dc': 'DCA',
+    'washingtondc': 'DCA',
+    
+    # Additional variations and common misspellings
+    'jo\'burg': 'JNB',
+    'jo-burg': 'JNB',
+    'new york city': 'JFK',
+    'la': 'LAX',
+    'sf': 'SFO',
+    'dc': 'DCA',
+})
+
+# Alternative airport codes for cities with multiple airports
+_ALTERNATIVE_AIRPORTS = MappingProxyType({
+    'london': ['LHR', 'LGW', 'STN', 'LTN'],
+    'new york': ['JFK', 'LGA', 'EWR'],
+    'paris': ['CDG', 'ORY'],
+    'tokyo': ['NRT', 'HND'],
+    'milan': ['MXP', 'LIN'],
+    'rome': ['FCO', 'CIA'],
+    'chicago': ['ORD', 'MDW'],
+    'houston': ['IAH', 'HOU'],
+    'washington': ['DCA', 'IAD', 'BWI'],
+})
+
+# Country to major airport mappings
+_COUNTRY_TO_AIRPORT = MappingProxyType({
+    # African Countries
+    'ethiopia': 'ADD',  # Addis Ababa Bole International Airport
+    'south africa': 'JNB',  # OR Tambo International Airport, Johannesburg
+    'southafrica': 'JNB',
+    'kenya': 'NBO',  # Jomo Kenyatta International Airport, Nairobi
+    'nigeria': 'LOS',  # Murtala Muhammed International Airport, Lagos
+    'egypt': 'CAI',  # Cairo International Airport
+    'morocco': 'CMN',  # Mohammed V International Airport, Casablanca
+    'ghana': 'ACC',  # Kotoka International Airport, Accra
+    'tanzania': 'DAR',  # Julius Nyerere International Airport, Dar es Salaam
+    'zimbabwe': 'HRE',  # Robert Gabriel Mugabe International Airport, Harare
+    'zambia': 'LUN',  # Kenneth Kaunda International Airport, Lusaka
+    'botswana': 'GBE',  # Sir Seretse Khama International Airport, Gaborone
+    'namibia': 'WDH',  # Hosea Kutako International Airport, Windhoek
+    'uganda': 'EBB',  # Entebbe International Airport
+    'rwanda': 'KGL',  # Kigali International Airport
+    'senegal': 'DKR',  # Blaise Diagne International Airport, Dakar
+    'ivory coast': 'ABJ',  # Félix-Houphouët-Boigny International Airport, Abidjan
+    'ivorycoast': 'ABJ',
+    'cote d\'ivoire': 'ABJ',
+    'cotedivoire': 'ABJ',
+    'tunisia': 'TUN',  # Tunis-Carthage International Airport
+    'algeria': 'ALG',  # Houari Boumediene Airport, Algiers
+    'libya': 'TIP',  # Tripoli International Airport
+    'sudan': 'KRT',  # Khartoum International Airport
+    'madagascar': 'TNR',  # Ivato International Airport, Antananarivo
+    'mauritius': 'MRU',  # Sir Seewoosagur Ramgoolam International Airport
+    'seychelles': 'SEZ',  # Seychelles International Airport
+    
+    # Major International Countries
+    'united states': 'JFK',  # John F. Kennedy International Airport, New York
+    'unitedstates': 'JFK',
+    'usa': 'JFK',
+    'america': 'JFK',
+    'united kingdom': 'LHR',  # Heathrow Airport, London
+    'unitedkingdom': 'LHR',
+    'uk': 'LHR',
+    'britain': 'LHR',
+    'england': 'LHR',
+    'france': 'CDG',  # Charles de Gaulle Airport, Paris
+    'germany': 'FRA',  # Frankfurt Airport
+    'italy': 'FCO',  # Leonardo da Vinci International Airport, Rome
+    'spain': 'MAD',  # Adolfo Suárez Madrid-Barajas Airport
+    'netherlands': 'AMS',  # Amsterdam Airport Schiphol
+    'switzerland': 'ZUR',  # Zurich Airport
+    'austria': 'VIE',  # Vienna International Airport
+    'belgium': 'BRU',  # Brussels Airport
+    'sweden': 'ARN',  # Stockholm Arlanda Airport
+    'norway': 'OSL',  # Oslo Airport
+    'denmark': 'CPH',  # Copenhagen Airport
+    'finland': 'HEL',  # Helsinki Airport
+    'greece': 'ATH',  # Athens International Airport
+    'portugal': 'LIS',  # Lisbon Airport
+    'ireland': 'DUB',  # Dublin Airport
+    'russia': 'SVO',  # Sheremetyevo International Airport, Moscow
+    'turkey': 'IST',  # Istanbul Airport
+    'china': 'PEK',  # Beijing Capital International Airport
+    'japan': 'NRT',  # Narita International Airport, Tokyo
+    'india': 'DEL',  # Indira Gandhi International Airport, New Delhi
+    'australia': 'SYD',  # Kingsford Smith Airport, Sydney
+    'canada': 'YYZ',  # Toronto Pearson International Airport
+    'brazil': 'GRU',  # São Paulo/Guarulhos International Airport
+    'argentina': 'EZE',  # Ezeiza International Airport, Buenos Aires
+    'mexico': 'MEX',  # Mexico City International Airport
+    'thailand': 'BKK',  # Suvarnabhumi Airport, Bangkok
+    'singapore': 'SIN',  # Singapore Changi Airport
+    'malaysia': 'KUL',  # Kuala Lumpur International Airport
+    'indonesia': 'CGK',  # Soekarno-Hatta International Airport, Jakarta
+    'philippines': 'MNL',  # Ninoy Aquino International Airport, Manila
+    'vietnam': 'SGN',  # Tan Son Nhat International Airport, Ho Chi Minh City
+    'south korea': 'ICN',  # Incheon International Airport, Seoul
+    'southkorea': 'ICN',
+    'uae': 'DXB',  # Dubai International Airport
+    'united arab emirates': 'DXB',
+    'unitedarabemirates': 'DXB',
+    'qatar': 'DOH',  # Hamad International Airport, Doha
+    'saudi arabia': 'RUH',  # King Khalid International Airport, Riyadh
+    'saudiarabia': 'RUH',
+    'israel': 'TLV',  # Ben Gurion Airport, Tel Aviv
+    'iran': 'IKA',  # Imam Khomeini International Airport, Tehran
+    'pakistan': 'KHI',  # Jinnah International Airport, Karachi
+    'bangladesh': 'DAC',  # Hazrat Shahjalal International Airport, Dhaka
+    'sri lanka': 'CMB',  # Bandaranaike International Airport, Colombo
+    'srilanka': 'CMB',
+})
+
+# Common city name variations and aliases
+_CITY_ALIASES = MappingProxyType({
+    'jo\'burg': 'johannesburg',
+    'joburg': 'johannesburg',
+    'jburg': 'johannesburg',
+    'cape town': 'cape town',
+    'capetown': 'cape town',
+    'nyc': 'new york',
+    'new york city': 'new york',
+    'newyork': 'new york',
+    'la': 'los angeles',
+    'losangeles': 'los angeles',
+    'sf': 'san francisco',
+    'sanfrancisco': 'san francisco',
+    'vegas': 'las vegas',
+    'lasvegas': 'las vegas',
+    'dc': 'washington',
+    'washington dc': 'washington',
+    'washingtondc': 'washington',
+    'new delhi': 'delhi',
+    'newdelhi': 'delhi',
+    'hong kong': 'hong kong',
+    'hongkong': 'hong kong',
+})
+
+def _resolve_location(name: str, seen: Tuple[str, ...] = ()) -> Optional[str]:
+    """
+    Resolve a location name to its airport code at import time: city, then country, then
+    alias. Aliases are followed through any number of hops, and cycles resolve to None.
+    """
+    if name in _CITY_TO_AIRPORT:
+        return _CITY_TO_AIRPORT[name]
+    if name in _COUNTRY_TO_AIRPORT:
+        return _COUNTRY_TO_AIRPORT[name]
+    if name in _CITY_ALIASES and name not in seen:
+        return _resolve_location(_CITY_ALIASES[name], seen + (name,))
+    return None
+
+
+# Every known location name resolved to its airport code in one flat mapping, so lookups are a
+# single probe with no alias indirection left at query time. Names that resolve to nothing
+# are left out.
+_LOCATION_INDEX = MappingProxyType({
+    name: code
+    for name in (*_CITY_ALIASES, *_COUNTRY_TO_AIRPORT, *_CITY_TO_AIRPORT)
+    if (code := _resolve_location(name))
+})
+
+# Candidates for fuzzy matching of typos
+_LOCATION_KEYS = tuple(_LOCATION_INDEX)
+
+# Minimum fuzz.ratio score for a typo match
+_FUZZY_CUTOFF = 80
+
+
+@functools.lru_cache(maxsize=64)
+def _fuzzy_candidates(length: int) -> Tuple[str, ...]:
+    """
+    Location keys whose length allows a fuzz.ratio of at least _FUZZY_CUTOFF against a query
+    of the given length. ratio <= 200 * min(a, b) / (a + b), so for a cutoff of 80 only keys
+    between 2/3 and 3/2 of the query length can match; the rest are skipped without scoring.
+    Keys keep their _LOCATION_KEYS order, so ties resolve exactly as with the full list.
+    """
+    return tuple(
+        key for key in _LOCATION_KEYS
+        if 200 * min(length, len(key)) >= _FUZZY_CUTOFF * (length + len(key))
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class LocationInfo:
+    """Standardized location information returned by standardize_location_input."""
+    original: str
+    normalized: str
+    airport_code: Optional[str]
+    canonical_name: str
+    is_airport_code: bool
+    alternatives: Tuple[str, ...]
+    
+    def __getitem__(self, key: str) -> Any:
+        # Keeps dict-style access (info['airport_code']) working for existing callers
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the information as a plain dict"""
+        return asdict(self)
 
 
 class CityStandardizer:
     """Handles city name standardization and airport code mapping."""
     
     def __init__(self):
-        # Comprehensive city to airport code mapping
-        self.city_to_airport = {
-            # Major African Cities
-            'durban': 'DUR',
-            'harare': 'HRE',
-            'cape town': 'CPT',
-            'capetown': 'CPT',
-            'johannesburg': 'JNB',
-            'joburg': 'JNB',
-            'jburg': 'JNB',
-            'cairo': 'CAI',
-            'lagos': 'LOS',
-            'nairobi': 'NBO',
-            'casablanca': 'CMN',
-            'addis ababa': 'ADD',
-            'dar es salaam': 'DAR',
-            'accra': 'ACC',
-            'tunis': 'TUN',
-            'algiers': 'ALG',
-            'kigali': 'KGL',
-            'lusaka': 'LUN',
-            'maputo': 'MPM',
-            'windhoek': 'WDH',
-            'gaborone': 'GBE',
-            'maseru': 'MSU',
-            'mbabane': 'MTS',
-            'blantyre': 'BLZ',
-            'lilongwe': 'LLW',
-            
-            # Major International Cities
-            'london': 'LHR',
-            'paris': 'CDG',
-            'new york': 'JFK',
-            'newyork': 'JFK',
-            'nyc': 'JFK',
-            'los angeles': 'LAX',
-            'losangeles': 'LAX',
-            'chicago': 'ORD',
-            'miami': 'MIA',
-            'toronto': 'YYZ',
-            'vancouver': 'YVR',
-            'sydney': 'SYD',
-            'melbourne': 'MEL',
-            'tokyo': 'NRT',
-            'beijing': 'PEK',
-            'shanghai': 'PVG',
-            'hong kong': 'HKG',
-            'hongkong': 'HKG',
-            'singapore': 'SIN',
-            'bangkok': 'BKK',
-            'mumbai': 'BOM',
-            'delhi': 'DEL',
-            'new delhi': 'DEL',
-            'newdelhi': 'DEL',
-            'dubai': 'DXB',
-            'doha': 'DOH',
-            'istanbul': 'IST',
-            'moscow': 'SVO',
-            'amsterdam': 'AMS',
-            'frankfurt': 'FRA',
-            'zurich': 'ZUR',
-            'madrid': 'MAD',
-            'barcelona': 'BCN',
-            'rome': 'FCO',
-            'milan': 'MXP',
-            'vienna': 'VIE',
-            'brussels': 'BRU',
-            'stockholm': 'ARN',
-            'oslo': 'OSL',
-            'copenhagen': 'CPH',
-            'helsinki': 'HEL',
-            'athens': 'ATH',
-            'lisbon': 'LIS',
-            'dublin': 'DUB',
-            'edinburgh': 'EDI',
-            'manchester': 'MAN',
-            'birmingham': 'BHX',
-            'glasgow': 'GLA',
-            
-            # US Cities
-            'atlanta': 'ATL',
-            'boston': 'BOS',
-            'dallas': 'DFW',
-            'denver': 'DEN',
-            'detroit': 'DTW',
-            'houston': 'IAH',
-            'las vegas': 'LAS',
-            'lasvegas': 'LAS',
-            'vegas': 'LAS',
-            'minneapolis': 'MSP',
-            'orlando': 'MCO',
-            'philadelphia': 'PHL',
-            'phoenix': 'PHX',
-            'portland': 'PDX',
-            'san francisco': 'SFO',
-            'sanfrancisco': 'SFO',
-            'seattle': 'SEA',
-            'washington': 'DCA',
-            'washington dc': 'DCA',
-            'washingtondc': 'DCA',
-            
-            # Additional variations and common misspellings
-            'jo\'burg': 'JNB',
-            'jo-burg': 'JNB',
-            'new york city': 'JFK',
-            'la': 'LAX',
-            'sf': 'SFO',
-            'dc': 'DCA',
-        }
-        
-        # Alternative airport codes for cities with multiple airports
-        self.alternative_airports = {
-            'london': ['LHR', 'LGW', 'STN', 'LTN'],
-            'new york': ['JFK', 'LGA', 'EWR'],
-            'paris': ['CDG', 'ORY'],
-            'tokyo': ['NRT', 'HND'],
-            'milan': ['MXP', 'LIN'],
-            'rome': ['FCO', 'CIA'],
-            'chicago': ['ORD', 'MDW'],
-            'houston': ['IAH', 'HOU'],
-            'washington': ['DCA', 'IAD', 'BWI'],
-        }
-        
-        # Country to major airport mappings
-        self.country_to_airport = {
-            # African Countries
-            'ethiopia': 'ADD',  # Addis Ababa Bole International Airport
-            'south africa': 'JNB',  # OR Tambo International Airport, Johannesburg
-            'southafrica': 'JNB',
-            'kenya': 'NBO',  # Jomo Kenyatta International Airport, Nairobi
-            'nigeria': 'LOS',  # Murtala Muhammed International Airport, Lagos
-            'egypt': 'CAI',  # Cairo International Airport
-            'morocco': 'CMN',  # Mohammed V International Airport, Casablanca
-            'ghana': 'ACC',  # Kotoka International Airport, Accra
-            'tanzania': 'DAR',  # Julius Nyerere International Airport, Dar es Salaam
-            'zimbabwe': 'HRE',  # Robert Gabriel Mugabe International Airport, Harare
-            'zambia': 'LUN',  # Kenneth Kaunda International Airport, Lusaka
-            'botswana': 'GBE',  # Sir Seretse Khama International Airport, Gaborone
-            'namibia': 'WDH',  # Hosea Kutako International Airport, Windhoek
-            'uganda': 'EBB',  # Entebbe International Airport
-            'rwanda': 'KGL',  # Kigali International Airport
-            'senegal': 'DKR',  # Blaise Diagne International Airport, Dakar
-            'ivory coast': 'ABJ',  # Félix-Houphouët-Boigny International Airport, Abidjan
-            'ivorycoast': 'ABJ',
-            'cote d\'ivoire': 'ABJ',
-            'cotedivoire': 'ABJ',
-            'tunisia': 'TUN',  # Tunis-Carthage International Airport
-            'algeria': 'ALG',  # Houari Boumediene Airport, Algiers
-            'libya': 'TIP',  # Tripoli International Airport
-            'sudan': 'KRT',  # Khartoum International Airport
-            'madagascar': 'TNR',  # Ivato International Airport, Antananarivo
-            'mauritius': 'MRU',  # Sir Seewoosagur Ramgoolam International Airport
-            'seychelles': 'SEZ',  # Seychelles International Airport
-            
-            # Major International Countries
-            'united states': 'JFK',  # John F. Kennedy International Airport, New York
-            'unitedstates': 'JFK',
-            'usa': 'JFK',
-            'america': 'JFK',
-            'united kingdom': 'LHR',  # Heathrow Airport, London
-            'unitedkingdom': 'LHR',
-            'uk': 'LHR',
-            'britain': 'LHR',
-            'england': 'LHR',
-            'france': 'CDG',  # Charles de Gaulle Airport, Paris
-            'germany': 'FRA',  # Frankfurt Airport
-            'italy': 'FCO',  # Leonardo da Vinci International Airport, Rome
-            'spain': 'MAD',  # Adolfo Suárez Madrid-Barajas Airport
-            'netherlands': 'AMS',  # Amsterdam Airport Schiphol
-            'switzerland': 'ZUR',  # Zurich Airport
-            'austria': 'VIE',  # Vienna International Airport
-            'belgium': 'BRU',  # Brussels Airport
-            'sweden': 'ARN',  # Stockholm Arlanda Airport
-            'norway': 'OSL',  # Oslo Airport
-            'denmark': 'CPH',  # Copenhagen Airport
-            'finland': 'HEL',  # Helsinki Airport
-            'greece': 'ATH',  # Athens International Airport
-            'portugal': 'LIS',  # Lisbon Airport
-            'ireland': 'DUB',  # Dublin Airport
-            'russia': 'SVO',  # Sheremetyevo International Airport, Moscow
-            'turkey': 'IST',  # Istanbul Airport
-            'china': 'PEK',  # Beijing Capital International Airport
-            'japan': 'NRT',  # Narita International Airport, Tokyo
-            'india': 'DEL',  # Indira Gandhi International Airport, New Delhi
-            'australia': 'SYD',  # Kingsford Smith Airport, Sydney
-            'canada': 'YYZ',  # Toronto Pearson International Airport
-            'brazil': 'GRU',  # São Paulo/Guarulhos International Airport
-            'argentina': 'EZE',  # Ezeiza International Airport, Buenos Aires
-            'mexico': 'MEX',  # Mexico City International Airport
-            'thailand': 'BKK',  # Suvarnabhumi Airport, Bangkok
-            'singapore': 'SIN',  # Singapore Changi Airport
-            'malaysia': 'KUL',  # Kuala Lumpur International Airport
-            'indonesia': 'CGK',  # Soekarno-Hatta International Airport, Jakarta
-            'philippines': 'MNL',  # Ninoy Aquino International Airport, Manila
-            'vietnam': 'SGN',  # Tan Son Nhat International Airport, Ho Chi Minh City
-            'south korea': 'ICN',  # Incheon International Airport, Seoul
-            'southkorea': 'ICN',
-            'uae': 'DXB',  # Dubai International Airport
-            'united arab emirates': 'DXB',
-            'unitedarabemirates': 'DXB',
-            'qatar': 'DOH',  # Hamad International Airport, Doha
-            'saudi arabia': 'RUH',  # King Khalid International Airport, Riyadh
-            'saudiarabia': 'RUH',
-            'israel': 'TLV',  # Ben Gurion Airport, Tel Aviv
-            'iran': 'IKA',  # Imam Khomeini International Airport, Tehran
-            'pakistan': 'KHI',  # Jinnah International Airport, Karachi
-            'bangladesh': 'DAC',  # Hazrat Shahjalal International Airport, Dhaka
-            'sri lanka': 'CMB',  # Bandaranaike International Airport, Colombo
-            'srilanka': 'CMB',
-        }
-        
-        # Common city name variations and aliases
-        self.city_aliases = {
-            'jo\'burg': 'johannesburg',
-            'joburg': 'johannesburg',
-            'jburg': 'johannesburg',
-            'cape town': 'cape town',
-            'capetown': 'cape town',
-            'nyc': 'new york',
-            'new york city': 'new york',
-            'newyork': 'new york',
-            'la': 'los angeles',
-            'losangeles': 'los angeles',
-            'sf': 'san francisco',
-            'sanfrancisco': 'san francisco',
-            'vegas': 'las vegas',
-            'lasvegas': 'las vegas',
-            'dc': 'washington',
-            'washington dc': 'washington',
-            'washingtondc': 'washington',
-            'new delhi': 'delhi',
-            'newdelhi': 'delhi',
-            'hong kong': 'hong kong',
-            'hongkong': 'hong kong',
-        }
+        # The lookup tables are static and shared by all instances
+        self.city_to_airport = _CITY_TO_AIRPORT
+        self.alternative_airports = _ALTERNATIVE_AIRPORTS
+        self.country_to_airport = _COUNTRY_TO_AIRPORT
+        self.city_aliases = _CITY_ALIASES
     
     def normalize_city_name(self, city_name: str) -> str:
         """
@@ -264,20 +345,7 @@ class CityStandardizer:
         if not city_name:
             return ""
         
-        # Convert to lowercase and strip whitespace
-        normalized = city_name.lower().strip()
-        
-        # Remove special characters except spaces, hyphens, and apostrophes
-        normalized = re.sub(r'[^\w\s\-\']', '', normalized)
-        
-        # Replace multiple spaces with single space
-        normalized = re.sub(r'\s+', ' ', normalized)
-        
-        # Handle common abbreviations and variations
-        normalized = normalized.replace('st.', 'saint')
-        normalized = normalized.replace('mt.', 'mount')
-        
-        return normalized.strip()
+        return _normalize_city_name(city_name)
     
     def get_airport_code(self, city_name: str) -> Optional[str]:
         """
@@ -292,45 +360,25 @@ class CityStandardizer:
         if not city_name:
             return None
         
-        # First, normalize the city name
-        normalized = self.normalize_city_name(city_name)
-        
-        # Check direct city mapping
-        if normalized in self.city_to_airport:
-            return self.city_to_airport[normalized]
-        
-        # Check country mapping
-        if normalized in self.country_to_airport:
-            return self.country_to_airport[normalized]
+        # Already an airport code: skip normalization and fuzzy matching
+        code = _as_airport_code(city_name)
+        if code:
+            return code
         
-        # Check city aliases
-        if normalized in self.city_aliases:
-            canonical_name = self.city_aliases[normalized]
-            if canonical_name in self.city_to_airport:
-                return self.city_to_airport[canonical_name]
+        return self._get_airport_code_normalized(self.normalize_city_name(city_name))
+    
+    def _get_airport_code_normalized(self, normalized: str) -> Optional[str]:
+        """get_airport_code for an input that has already been through normalize_city_name"""
+        # Check city, country and alias mappings in one probe
+        airport_code = _LOCATION_INDEX.get(normalized)
+        if airport_code:
+            return airport_code
         
         # Try fuzzy matching for typos (include both city and country mappings)
-        all_locations = (list(self.city_to_airport.keys()) + 
-                        list(self.country_to_airport.keys()) + 
-                        list(self.city_aliases.keys()))
-        
-        close_matches = get_close_matches(
-            normalized, 
-            all_locations,
-            n=1, 
-            cutoff=0.8
-        )
+        match = process.extractOne(normalized, _fuzzy_candidates(len(normalized)), scorer=fuzz.ratio, score_cutoff=_FUZZY_CUTOFF)
         
-        if close_matches:
-            match = close_matches[0]
-            if match in self.city_to_airport:
-                return self.city_to_airport[match]
-            elif match in self.country_to_airport:
-                return self.country_to_airport[match]
-            elif match in self.city_aliases:
-                canonical_name = self.city_aliases[match]
-                if canonical_name in self.city_to_airport:
-                    return self.city_to_airport[canonical_name]
+        if match:
+            return _LOCATION_INDEX[match[0]]
         
         return None
     
@@ -347,8 +395,12 @@ class CityStandardizer:
         if not city_name:
             return None, None, None
         
+        code = _as_airport_code(city_name)
+        if code:
+            return code, code, code
+        
         normalized = self.normalize_city_name(city_name)
-        airport_code = self.get_airport_code(city_name)
+        airport_code = self._get_airport_code_normalized(normalized)
         
         # Find canonical name
         canonical_name = normalized
@@ -367,7 +419,10 @@ class CityStandardizer:
         Returns:
             List of airport codes
         """
-        normalized = self.normalize_city_name(city_name)
+        return self._get_alternative_airports_normalized(self.normalize_city_name(city_name))
+    
+    def _get_alternative_airports_normalized(self, normalized: str) -> list:
+        """get_alternative_airports for an already normalized city name"""
         canonical_name = self.city_aliases.get(normalized, normalized)
         
         return self.alternative_airports.get(canonical_name, [])
@@ -386,9 +441,9 @@ class CityStandardizer:
             return False
         
         # Airport codes are typically 3 uppercase letters
-        return bool(re.match(r'^[A-Z]{3}$', code.upper()))
+        return bool(_AIRPORT_CODE_RE.match(code.upper()))
     
-    def standardize_location_input(self, location: str) -> Dict[str, str]:
+    def standardize_location_input(self, location: str) -> LocationInfo:
         """
         Comprehensive location standardization for search inputs.
         
@@ -396,49 +451,83 @@ class CityStandardizer:
             location: Raw location input (city name or airport code)
             
         Returns:
-            Dictionary with standardized location information
+            Immutable LocationInfo with standardized location information (memoized)
         """
-        if not location:
-            return {
-                'original': '',
-                'normalized': '',
-                'airport_code': None,
-                'canonical_name': '',
-                'is_airport_code': False,
-                'alternatives': []
-            }
-        
-        original = location.strip()
+        return _standardize_location_input(location.strip() if location else '')
+    
+    def _build_location_info(self, original: str) -> LocationInfo:
+        """Uncached implementation of standardize_location_input for a stripped location"""
+        if not original:
+            return LocationInfo(
+                original='',
+                normalized='',
+                airport_code=None,
+                canonical_name='',
+                is_airport_code=False,
+                alternatives=()
+            )
         
         # Check if input is already an airport code
         if self.is_valid_airport_code(original):
-            return {
-                'original': original,
-                'normalized': original.upper(),
-                'airport_code': original.upper(),
-                'canonical_name': original.upper(),
-                'is_airport_code': True,
-                'alternatives': []
-            }
+            return LocationInfo(
+                original=original,
+                normalized=original.upper(),
+                airport_code=original.upper(),
+                canonical_name=original.upper(),
+                is_airport_code=True,
+                alternatives=()
+            )
         
         # Process as city name
         normalized, airport_code, canonical_name = self.get_standardized_city_info(original)
-        alternatives = self.get_alternative_airports(original) if airport_code else []
-        
-        return {
-            'original': original,
-            'normalized': normalized or '',
-            'airport_code': airport_code,
-            'canonical_name': canonical_name or '',
-            'is_airport_code': False,
-            'alternatives': alternatives
-        }
+        alternatives = tuple(self._get_alternative_airports_normalized(normalized)) if airport_code else ()
+        
+        return LocationInfo(
+            original=original,
+            normalized=normalized or '',
+            airport_code=airport_code,
+            canonical_name=canonical_name or '',
+            is_airport_code=False,
+            alternatives=alternatives
+        )
+
+
+def _as_airport_code(city_name: str) -> Optional[str]:
+    """
+    Return the input if it is typed as an airport code (e.g. "JFK"), None otherwise.
+    Only uppercase input qualifies, so short city names like "rom" still go through
+    the lookup, and codes that are also aliases (e.g. "NYC") keep their mapping.
+    """
+    code = city_name.strip()
+    if _AIRPORT_CODE_RE.match(code) and code.lower() not in _LOCATION_INDEX:
+        return code
+    return None
 
 
 # Global instance for easy access
 city_standardizer = CityStandardizer()
 
 
+# The lookup tables are static, so results can be memoized across all instances
+@functools.lru_cache(maxsize=4096)
+def _normalize_city_name(city_name: str) -> str:
+    # Convert to lowercase and strip whitespace
+    normalized = city_name.lower().strip()
+    
+    # Remove special characters except spaces, hyphens, and apostrophes
+    normalized = _NON_WORD_RE.sub('', normalized)
+    
+    # Replace multiple spaces with single space
+    normalized = _MULTI_SPACE_RE.sub(' ', normalized)
+    
+    return normalized.strip()
+
+
+@functools.lru_cache(maxsize=4096)
+def _standardize_location_input(location: str) -> LocationInfo:
+    return city_standardizer._build_location_info(location)
+
+
 def standardize_city(city_name: str) -> str:
     """
     Quick function to get airport code for a city name.
@@ -450,10 +539,10 @@ def standardize_city(city_name: str) -> str:
         Airport code if found, original input otherwise
     """
     result = city_standardizer.standardize_location_input(city_name)
-    return result['airport_code'] or result['original']
+    return result.airport_code or result.original
 
 
-def get_city_info(city_name: str) -> Dict[str, str]:
+def get_city_info(city_name: str) -> LocationInfo:
     """
     Quick function to get comprehensive city information.
     
@@ -461,6 +550,6 @@ def get_city_info(city_name: str) -> Dict[str, str]:
         city_name: City name to analyze
         
     Returns:
-        Dictionary with standardized city information
+        LocationInfo with standardized city information
     """
     return city_standardizer.standardize_location_input(city_name)
\ No newline at end of file
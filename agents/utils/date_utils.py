@@ -0,0 +1,32 @@
+"""Date validation utilities for the AI Travel Agent tools"""
+import datetime
+from typing import Optional
+
+
+def validate_travel_date(value: Optional[str]) -> Optional[str]:
+    """
+    Validate a YYYY-MM-DD travel date before it is sent to SerpAPI.
+    
+    Args:
+        value: Date string; None or blank means the date was not provided
+        
+    Returns:
+        The date in canonical YYYY-MM-DD form, or the input unchanged if not provided
+        
+    Raises:
+        ValueError: If the date is malformed or in the past
+    """
+    if value is None or not value.strip():
+        return value
+    
+    value = value.strip()
+    try:
+        # Not date.fromisoformat: since 3.11 it also accepts forms like 20251201 and 2025-W49-1
+        date = datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'Invalid date {value!r}, expected the format YYYY-MM-DD') from None
+    
+    if date < datetime.date.today():
+        raise ValueError(f'Date {value} is in the past')
+    # strptime also takes unpadded months and days, so hand SerpAPI the zero-padded form
+    return date.isoformat()
@@ -1,4 +1,5 @@
 """Environment utilities for the AI Travel Agent application"""
+import functools
 import os
 from typing import Optional
 
@@ -14,4 +15,21 @@ def get_env_var(key: str, default: Optional[str] = None) -> Optional[str]:
     Returns:
         Environment variable value or default
     """
-    return os.getenv(key, default)
\ No newline at end of file
+    return os.getenv(key, default)
+
+
+@functools.lru_cache(maxsize=256)
+def get_cached_env_var(key: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Get an environment variable, reading os.environ only on the first call per key.
+
+    Meant for settings that are fixed for the life of the process and read on every
+    request. Values changed at runtime (e.g. sidebar overrides) must use get_env_var.
+    Call invalidate_env_cache() after changing the environment.
+    """
+    return os.getenv(key, default)
+
+
+def invalidate_env_cache() -> None:
+    """Drop the values memoized by get_cached_env_var"""
+    get_cached_env_var.cache_clear()
@@ -4,13 +4,15 @@ Vercel Serverless Function for AI Travel Agent
 Handles all API requests in a serverless environment
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import json
+from flask import Flask, Response, request
+import orjson
+import hashlib
+import re
 import time
 import logging
 import os
 import sys
+import threading
 from datetime import datetime
 
 # Configure logging first
@@ -20,127 +22,208 @@ logger = logging.getLogger(__name__)
 # Add the parent directory to the Python path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import the backend service
-try:
-    from app import TravelAgentBackend
-    logger.info("Successfully imported TravelAgentBackend")
-except ImportError as e:
-    logger.warning(f"Could not import TravelAgentBackend: {e}")
-    TravelAgentBackend = None
-except Exception as e:
-    logger.error(f"Unexpected error importing TravelAgentBackend: {e}")
-    TravelAgentBackend = None
+from mock_responses import DESTINATIONS_TEXT, GENERAL_HELP_TEXT
 
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)
+
+# Static CORS headers instead of flask_cors; OPTIONS preflights get an empty 204
+CORS_ORIGIN = os.getenv('CORS_ORIGIN', '*')
+
+@app.before_request
+def _cors_preflight():
+    if request.method == 'OPTIONS':
+        return Response(status=204)
+
+@app.after_request
+def _cors_headers(response):
+    response.headers['Access-Control-Allow-Origin'] = CORS_ORIGIN
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    response.headers['Access-Control-Max-Age'] = '86400'
+    return response
+
+# Last formatted timestamp as (epoch second, ISO string)
+_ts_cache = (0, '')
+
+def now_iso():
+    """ISO timestamp with one-second resolution, reused by all requests within the same second"""
+    global _ts_cache
+    second = int(time.time())
+    cached = _ts_cache
+    if cached[0] != second:
+        cached = _ts_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return cached[1]
+
+def read_json_body():
+    """Decode the JSON request body with orjson (raises orjson.JSONDecodeError if invalid)"""
+    return orjson.loads(request.get_data(cache=False))
+
+def json_response(obj, status=200):
+    """JSON response encoded with orjson (faster than jsonify on large payloads)"""
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
 
 # Initialize backend (will be created on first request to handle cold starts)
 backend = None
+_backend_lock = threading.Lock()
+
+# TravelAgentBackend class once imported (None if unavailable); _NOT_IMPORTED until first needed
+_NOT_IMPORTED = object()
+_backend_cls = _NOT_IMPORTED
+
+def _import_backend_cls():
+    """Import TravelAgentBackend on first use, so health/feedback requests skip the LangChain import"""
+    global _backend_cls
+    if _backend_cls is _NOT_IMPORTED:
+        try:
+            from app import TravelAgentBackend
+            logger.info("Successfully imported TravelAgentBackend")
+            _backend_cls = TravelAgentBackend
+        except ImportError as e:
+            logger.warning("Could not import TravelAgentBackend: %s", e)
+            _backend_cls = None
+        except Exception as e:
+            logger.error("Unexpected error importing TravelAgentBackend: %s", e)
+            _backend_cls = None
+    return _backend_cls
 
 def get_backend():
     """Get or create backend instance"""
     global backend
     if backend is None:
-        if TravelAgentBackend:
-            try:
-                logger.info("Attempting to initialize TravelAgentBackend...")
-                backend = TravelAgentBackend()
-                logger.info("TravelAgentBackend initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize TravelAgentBackend: {e}")
-                logger.info("Falling back to MockBackend")
-                backend = MockBackend()
-        else:
-            logger.info("TravelAgentBackend not available, using MockBackend")
-            backend = MockBackend()
+        # Double-checked so concurrent first requests build the backend only once
+        with _backend_lock:
+            if backend is None:
+                backend_cls = _import_backend_cls()
+                if backend_cls:
+                    try:
+                        logger.info("Attempting to initialize TravelAgentBackend...")
+                        backend = backend_cls()
+                        logger.info("TravelAgentBackend initialized successfully")
+                    except Exception as e:
+                        logger.error("Failed to initialize TravelAgentBackend: %s", e)
+                        logger.info("Falling back to MockBackend")
+                        backend = MockBackend()
+                else:
+                    logger.info("TravelAgentBackend not available, using MockBackend")
+                    backend = MockBackend()
     return backend
 
+# Canned mock replies, checked in order: the first category with a keyword anywhere in the
+# message (case-insensitive) wins, so each category costs one regex scan instead of a scan per word
+_MOCK_RESPONSES = (
+    (re.compile('flight|fly|plane|ticket|airport', re.IGNORECASE), {
+        'success': True,
+        'response_text': "I'd be happy to help you find flights! To provide you with the best options, I'll need a few details:\n\n✈️ **Flight Search:**\n- Departure city/airport\n- Destination city/airport\n- Departure date\n- Return date (if round trip)\n- Number of passengers\n- Preferred class (Economy, Business, First)\n\nPlease share these details and I'll find the best flight options for you!",
+        'flights': [],
+        'hotels': []
+    }),
+    (re.compile('hotel|accommodation|stay|room|booking', re.IGNORECASE), {
+        'success': True,
+        'response_text': "I'll help you find the perfect accommodation! To get started, please provide:\n\n🏨 **Hotel Search:**\n- Destination city\n- Check-in date\n- Check-out date\n- Number of guests\n- Number of rooms\n- Preferred amenities (pool, gym, spa, etc.)\n- Budget range\n\nShare these details and I'll find great hotel options for you!",
+        'flights': [],
+        'hotels': []
+    }),
+    (re.compile('destination|where|recommend|suggest|travel', re.IGNORECASE), {
+        'success': True,
+        'response_text': DESTINATIONS_TEXT,
+        'flights': [],
+        'hotels': []
+    }),
+)
+_MOCK_DEFAULT_RESPONSE = {
+    'success': True,
+    'response_text': GENERAL_HELP_TEXT,
+    'flights': [],
+    'hotels': []
+}
+
+def _prebuilt(response):
+    """Pre-encode the reply text so json_response splices it in without re-serializing"""
+    return {**response, 'response_text': orjson.Fragment(orjson.dumps(response['response_text']))}
+
+_MOCK_RESPONSES = tuple((pattern, _prebuilt(response)) for pattern, response in _MOCK_RESPONSES)
+_MOCK_DEFAULT_RESPONSE = _prebuilt(_MOCK_DEFAULT_RESPONSE)
+
 class MockBackend:
     """Mock backend for when the real backend is not available"""
     
+    __slots__ = ()  # stateless, so instances need no __dict__
+    
     def process_query(self, message):
         """Process user query with mock responses"""
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ['flight', 'fly', 'plane', 'ticket', 'airport']):
-            return {
-                'success': True,
-                'response_text': "I'd be happy to help you find flights! To provide you with the best options, I'll need a few details:\n\n✈️ **Flight Search:**\n- Departure city/airport\n- Destination city/airport\n- Departure date\n- Return date (if round trip)\n- Number of passengers\n- Preferred class (Economy, Business, First)\n\nPlease share these details and I'll find the best flight options for you!",
-                'flights': [],
-                'hotels': [],
-                'thread_id': f"mock_thread_{int(time.time())}"
-            }
-        elif any(word in message_lower for word in ['hotel', 'accommodation', 'stay', 'room', 'booking']):
-            return {
-                'success': True,
-                'response_text': "I'll help you find the perfect accommodation! To get started, please provide:\n\n🏨 **Hotel Search:**\n- Destination city\n- Check-in date\n- Check-out date\n- Number of guests\n- Number of rooms\n- Preferred amenities (pool, gym, spa, etc.)\n- Budget range\n\nShare these details and I'll find great hotel options for you!",
-                'flights': [],
-                'hotels': [],
-                'thread_id': f"mock_thread_{int(time.time())}"
-            }
-        elif any(word in message_lower for word in ['destination', 'where', 'recommend', 'suggest', 'travel']):
-            return {
-                'success': True,
-                'response_text': "Based on current trends and seasonal considerations, here are some amazing destinations I'd recommend:\n\n🌍 **Top Destinations:**\n\n🏖️ **Beach Destinations:**\n- Maldives (Perfect for relaxation)\n- Bali, Indonesia (Culture + beaches)\n- Santorini, Greece (Romantic getaway)\n\n🏔️ **Adventure Destinations:**\n- Swiss Alps (Hiking & skiing)\n- New Zealand (Outdoor activities)\n- Costa Rica (Wildlife & nature)\n\n🏛️ **Cultural Destinations:**\n- Kyoto, Japan (Traditional culture)\n- Rome, Italy (Historical sites)\n- Istanbul, Turkey (East meets West)\n\nWhat type of experience are you looking for?",
-                'flights': [],
-                'hotels': [],
-                'thread_id': f"mock_thread_{int(time.time())}"
-            }
-        else:
-            return {
-                'success': True,
-                'response_text': "Thank you for your question! I'm here to help you with all your travel needs. I can assist you with:\n\n✈️ **Flight bookings** - Find the best deals and routes\n🏨 **Hotel reservations** - Discover perfect accommodations\n📅 **Trip planning** - Create detailed itineraries\n🌍 **Destination advice** - Get personalized recommendations\n💰 **Budget planning** - Optimize your travel expenses\n📋 **Travel tips** - Essential information for your journey\n\nWhat specific aspect of your travel would you like help with?",
-                'flights': [],
-                'hotels': [],
-                'thread_id': f"mock_thread_{int(time.time())}"
-            }
+        response = next(
+            (response for pattern, response in _MOCK_RESPONSES if pattern.search(message)),
+            _MOCK_DEFAULT_RESPONSE,
+        )
+        return {**response, 'thread_id': f"mock_thread_{int(time.time())}"}
+
+# Weak ETags for the health payload minus its timestamp, one per backend state
+_HEALTH_ETAGS = {
+    available: 'W/"%s"' % hashlib.blake2b(
+        orjson.dumps({'status': 'healthy', 'backend_available': available, 'environment': 'vercel'}),
+        digest_size=8,
+    ).hexdigest()
+    for available in (False, True)
+}
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    # Reported without importing the backend: true once a real backend has been created
+    backend_available = backend is not None and not isinstance(backend, MockBackend)
+    etag = _HEALTH_ETAGS[backend_available]
+    # Probes that send back the last ETag get an empty 304 while the status is unchanged
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={'ETag': etag})
+    response = json_response({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'backend_available': TravelAgentBackend is not None,
+        'timestamp': now_iso(),
+        'backend_available': backend_available,
         'environment': 'vercel'
     })
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """Main chat endpoint for processing user messages"""
     try:
-        logger.info("Chat endpoint called")
+        logger.debug("Chat endpoint called")
         
-        data = request.get_json()
-        logger.info(f"Request data received: {data is not None}")
+        try:
+            data = read_json_body()
+        except orjson.JSONDecodeError:
+            return json_response({'error': 'Invalid JSON'}, 400)
+        logger.debug("Request data received: %s", data is not None)
         
         if not data or 'message' not in data:
             logger.warning("Invalid request: missing message")
-            return jsonify({'error': 'Message is required'}), 400
+            return json_response({'error': 'Message is required'}, 400)
         
         user_message = data['message'].strip()
         if not user_message:
             logger.warning("Empty message received")
-            return jsonify({'error': 'Message cannot be empty'}), 400
+            return json_response({'error': 'Message cannot be empty'}, 400)
         
-        logger.info(f"Processing message: {user_message[:100]}...")
+        logger.info("Processing message: %s...", user_message[:100])
         
         # Get backend instance
         try:
             backend_instance = get_backend()
-            logger.info(f"Backend instance obtained: {type(backend_instance).__name__}")
+            logger.debug("Backend instance obtained: %s", type(backend_instance).__name__)
         except Exception as e:
-            logger.error(f"Failed to get backend instance: {e}")
+            logger.error("Failed to get backend instance: %s", e)
             raise
         
         # Process the message
         start_time = time.time()
         try:
             result = backend_instance.process_query(user_message)
-            logger.info(f"Backend processing completed: {result.get('success', False)}")
+            logger.info("Backend processing completed: %s", result.get('success', False))
         except Exception as e:
-            logger.error(f"Backend processing failed: {e}")
+            logger.error("Backend processing failed: %s", e)
             raise
         processing_time = time.time() - start_time
         
@@ -153,48 +236,66 @@ def chat():
                     'thread_id': result.get('thread_id')
                 },
                 'processing_time': round(processing_time, 2),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso()
             }
-            logger.info(f"Successfully processed message in {processing_time:.2f}s")
-            return jsonify(response)
+            logger.info("Successfully processed message in %.2fs", processing_time)
+            return json_response(response)
         else:
             error_msg = result.get('error', 'Failed to process your request')
-            logger.error(f"Backend processing failed: {error_msg}")
-            return jsonify({
+            logger.error("Backend processing failed: %s", error_msg)
+            return json_response({
                 'error': error_msg,
-                'timestamp': datetime.now().isoformat()
-            }), 500
+                'timestamp': now_iso()
+            }, 500)
             
     except Exception as e:
-        logger.error(f"Error in chat endpoint: {str(e)}")
-        return jsonify({
+        logger.error("Error in chat endpoint: %s", e)
+        return json_response({
             'error': 'Internal server error',
-            'timestamp': datetime.now().isoformat()
-        }), 500
+            'timestamp': now_iso()
+        }, 500)
 
 @app.route('/api/feedback', methods=['POST'])
 def feedback():
     """Feedback endpoint"""
     try:
-        data = request.get_json()
+        try:
+            data = read_json_body()
+        except orjson.JSONDecodeError:
+            return json_response({'error': 'Invalid JSON'}, 400)
         
         if not data:
-            return jsonify({'error': 'Feedback data is required'}), 400
+            return json_response({'error': 'Feedback data is required'}, 400)
         
-        # Log feedback (in production, you'd save to database)
-        logger.info(f"Feedback received: {json.dumps(data, indent=2)}")
+        # Log feedback (in production, you'd save to database). Each event is written right away as
+        # one compact line: a frozen or recycled serverless instance would lose anything buffered
+        logger.info("Feedback received: %s", orjson.dumps(data).decode())
         
-        return jsonify({
+        return json_response({
             'message': 'Thank you for your feedback!',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         })
         
     except Exception as e:
-        logger.error(f"Error in feedback endpoint: {str(e)}")
-        return jsonify({
+        logger.error("Error in feedback endpoint: %s", e)
+        return json_response({
             'error': 'Failed to process feedback',
-            'timestamp': datetime.now().isoformat()
-        }), 500
+            'timestamp': now_iso()
+        }, 500)
+
+@app.route('/api/warmup', methods=['GET'])
+def warmup():
+    """Create the backend now, so a cron or monitor can take the cold-start hit instead of a user"""
+    backend_instance = get_backend()
+    return json_response({
+        'warm': True,
+        'backend_available': not isinstance(backend_instance, MockBackend),
+        'timestamp': now_iso()
+    })
+
+# Opt-in: build the backend while the container loads rather than on the first chat request
+if os.getenv('PREWARM_BACKEND', '0') == '1':
+    get_backend()
 
 # For local testing
 if __name__ == '__main__':
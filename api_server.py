@@ -4,166 +4,259 @@ Fly Buddy API Server
 Provides REST API endpoints for the frontend to communicate with the backend service.
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import json
+from flask import Flask, Response, request
+import orjson
+import importlib.util
+import itertools
+import re
 import time
 import logging
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 import sys
 import os
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file when run as a script; the module-level setup
+# below already reads them. Imported by a WSGI server, the platform provides the environment
+if __name__ == '__main__':
+    load_dotenv()
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from mock_responses import DESTINATIONS_TEXT, GENERAL_HELP_TEXT
+
 # Import the backend service
 try:
-    from app import TravelAgentBackend
+    from app import TravelAgentBackend, get_backend
 except ImportError as e:
     print(f"Warning: Could not import TravelAgentBackend: {e}")
     TravelAgentBackend = None
 
 # Configure logging for production
 log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(
-    level=getattr(logging, log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        # Add file handler for production
-        logging.FileHandler('api_server.log') if os.getenv('LOG_TO_FILE', 'False').lower() == 'true' else logging.NullHandler()
-    ]
-)
+log_handlers = [logging.StreamHandler()]
+if os.getenv('LOG_TO_FILE', 'False').lower() == 'true':
+    # Add file handler for production
+    log_handlers.append(logging.FileHandler('api_server.log'))
+for handler in log_handlers:
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+# Request threads only enqueue log records; a listener thread does the console/file writes
+log_queue = queue.SimpleQueue()
+logging.basicConfig(level=getattr(logging, log_level), handlers=[QueueHandler(log_queue)])
+
+def start_log_listener():
+    """Start the thread that drains log_queue; threads don't survive fork, so each worker calls this too"""
+    listener = QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+log_listener = start_log_listener()
+
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend communication
 
-# Initialize the backend service
+# CORS without flask_cors: the same static headers on every response, and preflights answered directly
+CORS_ORIGIN = os.getenv('CORS_ORIGIN', '*')
+
+@app.before_request
+def _cors_preflight():
+    if request.method == 'OPTIONS':
+        return Response(status=204)
+
+@app.after_request
+def _cors_headers(response):
+    response.headers['Access-Control-Allow-Origin'] = CORS_ORIGIN
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    response.headers['Access-Control-Max-Age'] = '86400'
+    return response
+
+# (epoch second, ISO string) of the last formatted timestamp; replaced as a whole so threads never see a torn pair
+_ts_cache = (0, '')
+
+def now_iso():
+    """Current local time as an ISO string, formatted at most once per second"""
+    global _ts_cache
+    second = int(time.time())
+    cached = _ts_cache
+    if cached[0] != second:
+        cached = _ts_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return cached[1]
+
+def read_json_body():
+    """Parse the request body with orjson, without caching the raw bytes on the request"""
+    return orjson.loads(request.get_data(cache=False))
+
+def json_response(obj, status=200):
+    """Serialize obj with orjson, which is much faster than jsonify for the nested chat payloads"""
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+
+# Backend service, built by init_backend()
 backend = None
-if TravelAgentBackend:
-    try:
-        backend = TravelAgentBackend()
-        logger.info("TravelAgentBackend initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize TravelAgentBackend: {e}")
-        backend = None
-else:
-    logger.warning("TravelAgentBackend not available, using mock responses")
+_BACKEND_IS_REAL = False
+_BACKEND_TYPE = 'mock'
+
+# Canned mock replies, checked in order: the first category with a keyword anywhere in the
+# message (case-insensitive) wins, so each category costs one regex scan instead of a scan per word
+_MOCK_RESPONSES = (
+    (re.compile('flight|fly|airline|airport', re.IGNORECASE), {
+        'response': "I found several flight options for your request. Here are some great deals:\n\n✈️ **Flight Options:**\n- Delta Airlines: $299 (Direct flight)\n- American Airlines: $275 (1 stop)\n- United Airlines: $320 (Direct flight)\n\nWould you like me to help you book one of these flights or search for different dates?",
+        'type': 'flight_search',
+        'data': {
+            'flights': [
+                {'airline': 'Delta', 'price': 299, 'type': 'Direct'},
+                {'airline': 'American', 'price': 275, 'type': '1 stop'},
+                {'airline': 'United', 'price': 320, 'type': 'Direct'}
+            ]
+        }
+    }),
+    (re.compile('hotel|accommodation|stay|room', re.IGNORECASE), {
+        'response': "I found some excellent hotel options for you:\n\n🏨 **Hotel Recommendations:**\n- Grand Plaza Hotel: $150/night (4.5⭐)\n- City Center Inn: $89/night (4.2⭐)\n- Luxury Resort & Spa: $280/night (4.8⭐)\n\nAll hotels include free WiFi and breakfast. Would you like more details about any of these options?",
+        'type': 'hotel_search',
+        'data': {
+            'hotels': [
+                {'name': 'Grand Plaza Hotel', 'price': 150, 'rating': 4.5},
+                {'name': 'City Center Inn', 'price': 89, 'rating': 4.2},
+                {'name': 'Luxury Resort & Spa', 'price': 280, 'rating': 4.8}
+            ]
+        }
+    }),
+    (re.compile('itinerary|plan|schedule|trip', re.IGNORECASE), {
+        'response': "I'd be happy to help you plan your trip! Here's a suggested itinerary:\n\n📅 **3-Day Itinerary:**\n\n**Day 1:** Arrival & City Exploration\n- Check into hotel\n- Visit downtown area\n- Dinner at local restaurant\n\n**Day 2:** Main Attractions\n- Morning: Museum tour\n- Afternoon: Scenic viewpoint\n- Evening: Cultural show\n\n**Day 3:** Departure\n- Last-minute shopping\n- Airport transfer\n\nWould you like me to customize this itinerary based on your specific interests?",
+        'type': 'itinerary_planning'
+    }),
+    (re.compile('destination|where|recommend|suggest', re.IGNORECASE), {
+        'response': DESTINATIONS_TEXT,
+        'type': 'destination_recommendation'
+    }),
+)
+_MOCK_DEFAULT_RESPONSE = {
+    'response': GENERAL_HELP_TEXT,
+    'type': 'general_assistance'
+}
+
+def _prebuilt(response):
+    """Encode a canned reply's text to JSON once; orjson writes Fragments into responses verbatim"""
+    return {**response, 'response': orjson.Fragment(orjson.dumps(response['response']))}
+
+_MOCK_RESPONSES = tuple((pattern, _prebuilt(response)) for pattern, response in _MOCK_RESPONSES)
+_MOCK_DEFAULT_RESPONSE = _prebuilt(_MOCK_DEFAULT_RESPONSE)
 
 class MockBackend:
     """Mock backend for testing when the real backend is not available"""
     
+    __slots__ = ()  # stateless, so instances need no __dict__
+    
     def process_query(self, query):
         """Mock query processing"""
-        time.sleep(1)  # Simulate processing time
+        # Optional artificial latency for frontend testing; mocks answer instantly by default
+        mock_delay_ms = os.getenv('MOCK_DELAY_MS')
+        if mock_delay_ms:
+            time.sleep(float(mock_delay_ms) / 1000)
         
         # Generate contextual responses based on query content
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ['flight', 'fly', 'airline', 'airport']):
-            return {
-                'response': f"I found several flight options for your request. Here are some great deals:\n\n✈️ **Flight Options:**\n- Delta Airlines: $299 (Direct flight)\n- American Airlines: $275 (1 stop)\n- United Airlines: $320 (Direct flight)\n\nWould you like me to help you book one of these flights or search for different dates?",
-                'type': 'flight_search',
-                'data': {
-                    'flights': [
-                        {'airline': 'Delta', 'price': 299, 'type': 'Direct'},
-                        {'airline': 'American', 'price': 275, 'type': '1 stop'},
-                        {'airline': 'United', 'price': 320, 'type': 'Direct'}
-                    ]
-                }
-            }
-        elif any(word in query_lower for word in ['hotel', 'accommodation', 'stay', 'room']):
-            return {
-                'response': f"I found some excellent hotel options for you:\n\n🏨 **Hotel Recommendations:**\n- Grand Plaza Hotel: $150/night (4.5⭐)\n- City Center Inn: $89/night (4.2⭐)\n- Luxury Resort & Spa: $280/night (4.8⭐)\n\nAll hotels include free WiFi and breakfast. Would you like more details about any of these options?",
-                'type': 'hotel_search',
-                'data': {
-                    'hotels': [
-                        {'name': 'Grand Plaza Hotel', 'price': 150, 'rating': 4.5},
-                        {'name': 'City Center Inn', 'price': 89, 'rating': 4.2},
-                        {'name': 'Luxury Resort & Spa', 'price': 280, 'rating': 4.8}
-                    ]
-                }
-            }
-        elif any(word in query_lower for word in ['itinerary', 'plan', 'schedule', 'trip']):
-            return {
-                'response': f"I'd be happy to help you plan your trip! Here's a suggested itinerary:\n\n📅 **3-Day Itinerary:**\n\n**Day 1:** Arrival & City Exploration\n- Check into hotel\n- Visit downtown area\n- Dinner at local restaurant\n\n**Day 2:** Main Attractions\n- Morning: Museum tour\n- Afternoon: Scenic viewpoint\n- Evening: Cultural show\n\n**Day 3:** Departure\n- Last-minute shopping\n- Airport transfer\n\nWould you like me to customize this itinerary based on your specific interests?",
-                'type': 'itinerary_planning'
-            }
-        elif any(word in query_lower for word in ['destination', 'where', 'recommend', 'suggest']):
-            return {
-                'response': f"Based on current trends and seasonal considerations, here are some amazing destinations I'd recommend:\n\n🌍 **Top Destinations:**\n\n🏖️ **Beach Destinations:**\n- Maldives (Perfect for relaxation)\n- Bali, Indonesia (Culture + beaches)\n- Santorini, Greece (Romantic getaway)\n\n🏔️ **Adventure Destinations:**\n- Swiss Alps (Hiking & skiing)\n- New Zealand (Outdoor activities)\n- Costa Rica (Wildlife & nature)\n\n🏛️ **Cultural Destinations:**\n- Kyoto, Japan (Traditional culture)\n- Rome, Italy (Historical sites)\n- Istanbul, Turkey (East meets West)\n\nWhat type of experience are you looking for?",
-                'type': 'destination_recommendation'
-            }
-        else:
-            return {
-                'response': f"Thank you for your question! I'm here to help you with all your travel needs. I can assist you with:\n\n✈️ **Flight bookings** - Find the best deals and routes\n🏨 **Hotel reservations** - Discover perfect accommodations\n📅 **Trip planning** - Create detailed itineraries\n🌍 **Destination advice** - Get personalized recommendations\n💰 **Budget planning** - Optimize your travel expenses\n📋 **Travel tips** - Essential information for your journey\n\nWhat specific aspect of your travel would you like help with?",
-                'type': 'general_assistance'
-            }
+        for pattern, response in _MOCK_RESPONSES:
+            if pattern.search(query):
+                return dict(response)
+        return dict(_MOCK_DEFAULT_RESPONSE)
+
+def init_backend():
+    """
+    Build the real backend, falling back to the mock one if it is unavailable.
+
+    The backend owns a gRPC channel to Gemini, which is not fork-safe, so under gunicorn
+    it is built in each worker after fork rather than in the master.
+    """
+    global backend, _BACKEND_IS_REAL, _BACKEND_TYPE
+    backend = None
+    if TravelAgentBackend:
+        try:
+            backend = get_backend()
+            logger.info("TravelAgentBackend initialized successfully")
+        except Exception as e:
+            logger.error("Failed to initialize TravelAgentBackend: %s", e)
+            backend = None
+    else:
+        logger.warning("TravelAgentBackend not available, using mock responses")
+
+    # Initialize mock backend if real backend is not available
+    if not backend:
+        backend = MockBackend()
+
+    # The backend is fixed at startup, so whether it is the real one is checked only once
+    _BACKEND_IS_REAL = TravelAgentBackend is not None and isinstance(backend, TravelAgentBackend)
+    _BACKEND_TYPE = 'real' if _BACKEND_IS_REAL else 'mock'
+
+# Imported by a WSGI server: each worker imports this module itself, so build the backend now
+if __name__ != '__main__':
+    init_backend()
 
-# Initialize mock backend if real backend is not available
-if not backend:
-    backend = MockBackend()
+# Response type indexed by (has flights << 1 | has hotels)
+_RESPONSE_TYPES = ('general', 'hotel_search', 'flight_search', 'travel_search')
+
+# Chat response skeleton, copied per request so every response shares one key layout
+_RESPONSE_TEMPLATE = dict.fromkeys(('message', 'type', 'data', 'suggestions', 'metadata'))
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'backend_available': isinstance(backend, TravelAgentBackend) if TravelAgentBackend else False
+        'timestamp': now_iso(),
+        'backend_available': _BACKEND_IS_REAL
     })
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """Main chat endpoint for processing user messages"""
     try:
-        data = request.get_json()
+        try:
+            data = read_json_body()
+        except orjson.JSONDecodeError:
+            return json_response({'error': 'Invalid JSON'}, 400)
         
         if not data or 'message' not in data:
-            return jsonify({'error': 'Message is required'}), 400
+            return json_response({'error': 'Message is required'}, 400)
         
         user_message = data['message'].strip()
         if not user_message:
-            return jsonify({'error': 'Message cannot be empty'}), 400
+            return json_response({'error': 'Message cannot be empty'}, 400)
         
-        logger.info(f"Processing message: {user_message[:100]}...")
+        logger.info("Processing message: %s...", user_message[:100])
         
         # Process the message with the backend
         start_time = time.time()
         
-        if isinstance(backend, TravelAgentBackend):
+        if _BACKEND_IS_REAL:
             # Use real backend
             try:
                 result = backend.process_query(user_message)
                 if result.get('success', False):
                     response_text = result.get('response_text', 'I found some information for you!')
+                    flights = result.get('flights', [])
+                    hotels = result.get('hotels', [])
                     response_data = {
-                        'flights': result.get('flights', []),
-                        'hotels': result.get('hotels', []),
+                        'flights': flights,
+                        'hotels': hotels,
                         'thread_id': result.get('thread_id')
                     }
                     # Determine response type based on data
-                    if result.get('flights') and result.get('hotels'):
-                        response_type = 'travel_search'
-                    elif result.get('flights'):
-                        response_type = 'flight_search'
-                    elif result.get('hotels'):
-                        response_type = 'hotel_search'
-                    else:
-                        response_type = 'general'
+                    response_type = _RESPONSE_TYPES[bool(flights) << 1 | bool(hotels)]
                 else:
-                    logger.error(f"Backend processing failed: {result.get('error', 'Unknown error')}")
+                    logger.error("Backend processing failed: %s", result.get('error', 'Unknown error'))
                     response_text = "I apologize, but I encountered an issue processing your request."
                     response_data = {}
                     response_type = 'error'
             except Exception as e:
-                logger.error(f"Backend processing error: {e}")
+                logger.error("Backend processing error: %s", e)
                 response_text = "I apologize, but I'm experiencing technical difficulties. Please try again in a moment."
                 response_data = {}
                 response_type = 'error'
@@ -179,74 +272,80 @@ def chat():
         # Generate suggested follow-up questions based on response type
         suggestions = generate_suggestions(response_type, user_message)
         
-        response = {
-            'message': response_text,
-            'type': response_type,
-            'data': response_data,
-            'suggestions': suggestions,
-            'metadata': {
-                'timestamp': datetime.now().isoformat(),
-                'processing_time': round(processing_time, 2),
-                'backend_type': 'real' if isinstance(backend, TravelAgentBackend) else 'mock'
-            }
+        response = _RESPONSE_TEMPLATE.copy()
+        response['message'] = response_text
+        response['type'] = response_type
+        response['data'] = response_data
+        response['suggestions'] = suggestions
+        response['metadata'] = {
+            'timestamp': now_iso(),
+            'processing_time': round(processing_time, 2),
+            'backend_type': _BACKEND_TYPE
         }
         
-        logger.info(f"Response generated in {processing_time:.2f}ms")
-        return jsonify(response)
+        logger.info("Response generated in %.2fms", processing_time)
+        return json_response(response)
         
     except Exception as e:
-        logger.error(f"Chat endpoint error: {e}")
-        return jsonify({
+        logger.error("Chat endpoint error: %s", e)
+        return json_response({
             'error': 'Internal server error',
             'message': 'I apologize, but I encountered an unexpected error. Please try again.'
-        }), 500
+        }, 500)
+
+# Follow-up suggestions per response type
+_SUGGESTIONS = {
+    'flight_search': [
+        "Show me hotels in the same area",
+        "What's the baggage policy for these airlines?",
+        "Can you find flights for different dates?",
+        "Tell me about airport transportation options"
+    ],
+    'hotel_search': [
+        "Find flights to this destination",
+        "What are the local attractions nearby?",
+        "Show me restaurant recommendations",
+        "What's the cancellation policy?"
+    ],
+    'itinerary_planning': [
+        "Find flights for these dates",
+        "Recommend hotels for this itinerary",
+        "What's the weather like during this time?",
+        "Suggest local restaurants and activities"
+    ],
+    'destination_recommendation': [
+        "Tell me more about [destination name]",
+        "What's the best time to visit?",
+        "Find flights to these destinations",
+        "What's the average cost for this trip?"
+    ],
+    'general_assistance': [
+        "Help me plan a weekend getaway",
+        "Find flights for my next business trip",
+        "Recommend family-friendly destinations",
+        "What are the current travel restrictions?"
+    ],
+    'error': [
+        "Try asking about flights",
+        "Ask for hotel recommendations",
+        "Request destination suggestions",
+        "Get help with trip planning"
+    ]
+}
+
+# Every ordered choice of 3 suggestions per type, served round-robin instead of sampled at random
+_SUGGESTION_ROTATIONS = {
+    response_type: tuple(itertools.permutations(suggestions, min(3, len(suggestions))))
+    for response_type, suggestions in _SUGGESTIONS.items()
+}
+_suggestion_counter = itertools.count()
 
 def generate_suggestions(response_type, user_message):
     """Generate contextual follow-up suggestions"""
-    suggestions_map = {
-        'flight_search': [
-            "Show me hotels in the same area",
-            "What's the baggage policy for these airlines?",
-            "Can you find flights for different dates?",
-            "Tell me about airport transportation options"
-        ],
-        'hotel_search': [
-            "Find flights to this destination",
-            "What are the local attractions nearby?",
-            "Show me restaurant recommendations",
-            "What's the cancellation policy?"
-        ],
-        'itinerary_planning': [
-            "Find flights for these dates",
-            "Recommend hotels for this itinerary",
-            "What's the weather like during this time?",
-            "Suggest local restaurants and activities"
-        ],
-        'destination_recommendation': [
-            "Tell me more about [destination name]",
-            "What's the best time to visit?",
-            "Find flights to these destinations",
-            "What's the average cost for this trip?"
-        ],
-        'general_assistance': [
-            "Help me plan a weekend getaway",
-            "Find flights for my next business trip",
-            "Recommend family-friendly destinations",
-            "What are the current travel restrictions?"
-        ],
-        'error': [
-            "Try asking about flights",
-            "Ask for hotel recommendations",
-            "Request destination suggestions",
-            "Get help with trip planning"
-        ]
-    }
-    
-    base_suggestions = suggestions_map.get(response_type, suggestions_map['general_assistance'])
+    rotations = _SUGGESTION_ROTATIONS.get(response_type, _SUGGESTION_ROTATIONS['general_assistance'])
     
-    # Return 3 random suggestions
-    import random
-    return random.sample(base_suggestions, min(3, len(base_suggestions)))
+    # Return 3 suggestions, varying from one response to the next
+    return list(rotations[next(_suggestion_counter) % len(rotations)])
 
 
 
@@ -254,39 +353,48 @@ def generate_suggestions(response_type, user_message):
 def submit_feedback():
     """Submit user feedback"""
     try:
-        data = request.get_json()
+        try:
+            data = read_json_body()
+        except orjson.JSONDecodeError:
+            return json_response({'error': 'Invalid JSON'}, 400)
         feedback_type = data.get('type', 'general')
         message = data.get('message', '')
         rating = data.get('rating')
         
         # Log feedback (in a real implementation, this would be saved to a database)
-        logger.info(f"Feedback received - Type: {feedback_type}, Rating: {rating}, Message: {message[:100]}...")
+        logger.info("Feedback received - Type: %s, Rating: %s, Message: %s...", feedback_type, rating, message[:100])
         
-        return jsonify({
+        return json_response({
             'success': True,
             'message': 'Thank you for your feedback!'
         })
         
     except Exception as e:
-        logger.error(f"Feedback endpoint error: {e}")
-        return jsonify({'error': 'Failed to submit feedback'}), 500
+        logger.error("Feedback endpoint error: %s", e)
+        return json_response({'error': 'Failed to submit feedback'}, 500)
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    return json_response({'error': 'Endpoint not found'}, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return json_response({'error': 'Internal server error'}, 500)
 
 if __name__ == '__main__':
     # Get environment configuration
     debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     port = int(os.getenv('PORT', 5001))
     host = os.getenv('HOST', '0.0.0.0')
+    use_gunicorn = not (debug_mode or importlib.util.find_spec('gunicorn') is None or os.name == 'nt')
+    if not use_gunicorn:
+        init_backend()
     
     print("🚀 Starting Fly Buddy API Server...")
-    print(f"📡 Backend service: {'Available' if isinstance(backend, TravelAgentBackend) else 'Mock mode'}")
+    if use_gunicorn:
+        print("📡 Backend service: built in each worker")
+    else:
+        print(f"📡 Backend service: {'Available' if _BACKEND_IS_REAL else 'Mock mode'}")
     print(f"🌐 Server will be available at: http://{host}:{port}")
     print(f"🔧 Debug mode: {'Enabled' if debug_mode else 'Disabled (Production)'}")
     print("📋 API endpoints:")
@@ -295,11 +403,46 @@ if __name__ == '__main__':
     print("   - POST /api/feedback - Submit feedback")
     print("\n✨ Ready to serve requests!")
     
-    # Production-optimized configuration
-    app.run(
-        host=host, 
-        port=port, 
-        debug=debug_mode,
-        threaded=True,  # Enable threading for better performance
-        use_reloader=debug_mode  # Only use reloader in debug mode
-    )
\ No newline at end of file
+    if not use_gunicorn:
+        # Werkzeug server: for debugging, or where gunicorn is unavailable (e.g. Windows)
+        app.run(
+            host=host, 
+            port=port, 
+            debug=debug_mode,
+            threaded=True,  # Enable threading for better performance
+            use_reloader=debug_mode  # Only use reloader in debug mode
+        )
+    else:
+        # Production: gunicorn with threaded workers across all cores. The preloaded master only
+        # imports the modules; the backend and its gRPC channel are built after fork in each worker.
+        from gunicorn.app.base import BaseApplication
+
+        class StandaloneApplication(BaseApplication):
+            def __init__(self, application, options):
+                self.application = application
+                self.options = options
+                super().__init__()
+
+            def load_config(self):
+                for key, value in self.options.items():
+                    self.cfg.set(key, value)
+
+            def load(self):
+                return self.application
+
+        def post_fork(server, worker):
+            global log_listener
+            log_listener = start_log_listener()
+            init_backend()
+
+        # Stop the listener before forking so no worker inherits a handler lock held mid-write
+        atexit.unregister(log_listener.stop)
+        log_listener.stop()
+        StandaloneApplication(app, {
+            'bind': f'{host}:{port}',
+            'workers': int(os.getenv('WEB_CONCURRENCY', str(2 * (os.cpu_count() or 1) + 1))),
+            'worker_class': 'gthread',
+            'threads': int(os.getenv('GUNICORN_THREADS', '4')),
+            'preload_app': True,
+            'post_fork': post_fork,
+        }).run()
@@ -1,20 +1,176 @@
 # pylint: disable = invalid-name
 import os
 import uuid
+import itertools
 import datetime
+import html
 import re
-import json
+import logging
+import threading
 
-from langchain_core.messages import HumanMessage
+import orjson
+from dotenv import load_dotenv
+
+# Load environment variables for local development, before the agent modules read them at
+# import; servers get theirs from the platform
+if __name__ == '__main__':
+    load_dotenv()
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 
 from agents.agent import Agent
-from agents.utils.env_utils import get_env_var
+from agents.utils.env_utils import get_cached_env_var, get_env_var
+
+logger = logging.getLogger(__name__)
+
+# Parsed results returned to the client, and how many of them the fallback summary lists
+RESULT_LIMIT = 6
+SUMMARY_LIMIT = 3
+# Shared stand-in for missing nested objects; only ever read
+_EMPTY = {}
+# Section headers of the fallback summary, formatted with the number of results
+_FLIGHT_HEADER = "✈️ **Flight Options ({} found):**\n"
+_HOTEL_HEADER = "🏨 **Hotel Options ({} found):**\n"
+
+# Conversation thread ids: a random per-process prefix plus a counter, so ids stay unique
+# across workers without a urandom read and UUID formatting on every query
+_THREAD_ID_PREFIX = uuid.uuid4().hex[:12]
+_thread_counter = itertools.count(1)
+
+# Patterns used to clean AI messages and hotel fields, compiled once
+_CODE_FENCE_RE = re.compile(r'```[^`]*```', re.DOTALL)
+_INLINE_CODE_RE = re.compile(r'`[^`]*`')
+# Only real tags, comments and doctypes, so text like "under < 200" survives as html.parser would keep it
+_MARKUP_RE = re.compile(r'<!--.*?-->|<[!?/]?[a-zA-Z][^>]*>', re.DOTALL)
+# Tags whose content is dropped along with them in AI replies, and their closing tags
+_BLOCK_TAG_RE = re.compile(r'(pre|script|style|template)\b', re.IGNORECASE)
+_BLOCK_CLOSE_RES = {name: re.compile(rf'</{name}\s*>', re.IGNORECASE) for name in ('pre', 'script', 'style', 'template')}
+_WS_RE = re.compile(r'\s+')
+# Zero-width characters that entities like &#8203; and &zwnj; decode to; \s already covers NBSP
+_INVISIBLE_CHARS = str.maketrans(dict.fromkeys('\u200b\u200c\u200d\ufeff'))
+
+
+def _is_tag_start(text, i):
+    """Whether the '<' at text[i] opens a tag, comment or doctype (a letter after an optional !, ? or /)"""
+    c = text[i + 1:i + 2]
+    if c in ('!', '?', '/'):
+        c = text[i + 2:i + 3]
+    return c.isascii() and c.isalpha()
+
+
+def _strip_reply_markup(text):
+    """
+    Remove pre blocks (and non-text script/style content) with everything inside them, and any
+    other tag or comment, in one left-to-right scan.
+
+    Same result as a lazy '<pre>.*?</pre>|<!--.*?-->|<tag>' regex, but linear time: a regex
+    rescans to the end of the text for every unclosed '<pre>' or '<!--', which is quadratic
+    on long model output.
+    """
+    parts = []
+    pos = 0
+    # Block tags, and '--' for comments, already known to have no closer further on
+    unclosed = set()
+    i = text.find('<')
+    while i != -1:
+        if text.startswith('<!--', i):
+            end = -1 if '--' in unclosed else text.find('-->', i + 4)
+            if end != -1:
+                parts.append(text[pos:i])
+                pos = end + 3
+                i = text.find('<', pos)
+                continue
+            unclosed.add('--')
+        if _is_tag_start(text, i):
+            gt = text.find('>', i + 1)
+            if gt == -1:
+                # No tag can end anywhere after this point
+                break
+            parts.append(text[pos:i])
+            pos = gt + 1
+            block = _BLOCK_TAG_RE.match(text, i + 1)
+            if block:
+                name = block.group(1).lower()
+                if name not in unclosed:
+                    close = _BLOCK_CLOSE_RES[name].search(text, pos)
+                    if close:
+                        pos = close.end()
+                    else:
+                        unclosed.add(name)
+            i = text.find('<', pos)
+        else:
+            i = text.find('<', i + 1)
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+
+def _clean_html(text):
+    """Remove HTML tags and clean text content"""
+    if not text:
+        return ""
+    
+    text_str = text if type(text) is str else str(text)
+    
+    # Most SerpAPI fields are plain text: only collapse whitespace
+    if '<' not in text_str and '&' not in text_str:
+        return _WS_RE.sub(' ', text_str).strip()
+    
+    # Remove all HTML tags (a bare "<" as in "< 1 km" is text, not a tag)
+    clean_text = _MARKUP_RE.sub('', text_str)
+    
+    # Decode all named and numeric HTML entities in one pass, dropping invisible results
+    clean_text = html.unescape(clean_text).translate(_INVISIBLE_CHARS)
+    
+    # Remove extra whitespace
+    clean_text = _WS_RE.sub(' ', clean_text).strip()
+    
+    return clean_text
+
+
+# Separator for batch cleaning: neither whitespace (unlike \x1f) nor matched by the tag pattern
+_FIELD_SEP = '\x00'
+# Field types that are stringified without cleaning (exact types, so bools still go through it)
+_NUMBER_TYPES = (int, float)
+_FIELD_TAG_RE = re.compile(r'<!--[^\x00]*?-->|<[!?/]?[a-zA-Z][^>\x00]*>')
 
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
 
-# Load environment variables for local development
-load_dotenv()
+def _clean_html_many(values):
+    """
+    _clean_html for several values at once, as one tag/entity/whitespace pass over all of them.
+    Falsy values become "" exactly as with _clean_html; numbers (ratings, review counts, hotel
+    classes) can't hold markup and are only converted to text.
+    """
+    texts = [value if type(value) is str else str(value)
+             for value in values if value and type(value) not in _NUMBER_TYPES]
+    if any(_FIELD_SEP in text for text in texts):
+        return [_clean_html(value) for value in values]
+    
+    joined = _FIELD_SEP.join(texts)
+    if '<' in joined or '&' in joined:
+        joined = html.unescape(_FIELD_TAG_RE.sub('', joined)).translate(_INVISIBLE_CHARS)
+    joined = _WS_RE.sub(' ', joined)
+    cleaned = iter(joined.split(_FIELD_SEP))
+    return [
+        "" if not value else str(value) if type(value) in _NUMBER_TYPES else next(cleaned).strip()
+        for value in values
+    ]
+
+
+def _tool_results(message, previous):
+    """Result list of a flights/hotels ToolMessage, or previous if it carries none"""
+    if isinstance(message.artifact, list):
+        return message.artifact
+    content = message.content
+    if isinstance(content, list):
+        return content
+    if isinstance(content, (str, bytes, bytearray)):
+        # orjson decodes bytes directly, without a str() round-trip
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError as e:
+            logger.warning('Could not decode %s output: %s', message.name, e)
+    return previous
+
 
 class TravelAgentBackend:
     """Backend-only Fly Buddy"""
@@ -33,69 +189,52 @@ class TravelAgentBackend:
         if not content:
             return content
         
-        soup = BeautifulSoup(content, 'html.parser')
+        # Plain text with nothing to strip or decode is returned as-is
+        if '<' not in content and '&' not in content and '`' not in content:
+            return content.strip()
         
-        # Remove pre tags
-        for pre in soup.find_all('pre'):
-            pre.decompose()
-            
-        # Get text
-        text = soup.get_text()
+        text = content
+        # Most replies are plain markdown: skip the tag passes when there is no tag to match
+        if '<' in text:
+            # Remove pre blocks along with everything inside them, and all other tags and comments
+            text = _strip_reply_markup(text)
         
-        # Remove code blocks (triple backticks)
-        text = re.sub(r'```[^`]*```', '', text, flags=re.DOTALL)
+        # Decode entities (html.unescape returns at once when there is no '&')
+        text = html.unescape(text)
         
-        # Remove single backticks
-        text = re.sub(r'`[^`]*`', '', text)
+        # Checked after decoding, since &#96; becomes a backtick
+        if '`' in text:
+            # Remove code blocks (triple backticks)
+            text = _CODE_FENCE_RE.sub('', text)
+            
+            # Remove single backticks
+            text = _INLINE_CODE_RE.sub('', text)
         
         return text.strip()
     
     def parse_hotel_data(self, hotel_data):
         """Parse individual hotel data and return structured information"""
-        def clean_html(text):
-            """Remove HTML tags and clean text content"""
-            if not text:
-                return ""
-            
-            text_str = str(text)
-            
-            # Remove all HTML tags
-            clean_text = re.sub(r'<[^>]*>', '', text_str)
-            
-            # Remove HTML entities
-            clean_text = re.sub(r'&nbsp;', ' ', clean_text)
-            clean_text = re.sub(r'&amp;', '&', clean_text)
-            clean_text = re.sub(r'&lt;', '<', clean_text)
-            clean_text = re.sub(r'&gt;', '>', clean_text)
-            clean_text = re.sub(r'&quot;', '"', clean_text)
-            clean_text = re.sub(r'&#39;', "'", clean_text)
-            clean_text = re.sub(r'&[a-zA-Z0-9#]+;', '', clean_text)
-            
-            # Remove extra whitespace
-            clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-            
-            return clean_text
-        
         try:
-            # Extract hotel information
-            name = clean_html(hotel_data.get('name', 'Unknown Hotel'))
-            location = clean_html(hotel_data.get('location', 'Unknown Location'))
-            rating = clean_html(hotel_data.get('overall_rating', 'No rating'))
-            reviews = clean_html(hotel_data.get('reviews', 'No reviews'))
-            
-            # Price information
-            rate_info = hotel_data.get('rate_per_night', {})
-            price = clean_html(rate_info.get('lowest', 'Price not available'))
-            price_currency = clean_html(rate_info.get('currency', ''))
-            
-            # Additional details
-            hotel_class = clean_html(hotel_data.get('hotel_class', 'Not specified'))
-            property_type = clean_html(hotel_data.get('type', 'Hotel'))
-            distance = clean_html(hotel_data.get('distance_from_search_location', ''))
-            
-            # Amenities
+            rate_info = hotel_data.get('rate_per_night') or _EMPTY
             amenities = hotel_data.get('amenities', [])
-            top_amenities = [clean_html(amenity) for amenity in amenities[:4]] if amenities else []
+            
+            # Clean every displayed field in one batch: hotel information, price information,
+            # additional details and the top amenities
+            (name, location, rating, reviews,
+             price, price_currency,
+             hotel_class, property_type, distance,
+             *top_amenities) = _clean_html_many([
+                hotel_data.get('name', 'Unknown Hotel'),
+                hotel_data.get('location', 'Unknown Location'),
+                hotel_data.get('overall_rating', 'No rating'),
+                hotel_data.get('reviews', 'No reviews'),
+                rate_info.get('lowest', 'Price not available'),
+                rate_info.get('currency', ''),
+                hotel_data.get('hotel_class', 'Not specified'),
+                hotel_data.get('type', 'Hotel'),
+                hotel_data.get('distance_from_search_location', ''),
+                *(amenities[:4] if amenities else []),
+            ])
             
             # Images and link
             images = hotel_data.get('images', [])
@@ -129,7 +268,7 @@ class TravelAgentBackend:
             # Handle different data structures (real API vs sample data)
             if 'flights' in flight_data:
                 # Sample data structure with nested flights array
-                flight_info = flight_data['flights'][0] if flight_data['flights'] else {}
+                flight_info = flight_data['flights'][0] if flight_data['flights'] else _EMPTY
                 price = f"${flight_data.get('price', 'N/A')}"
             else:
                 # Real SerpAPI structure
@@ -137,8 +276,8 @@ class TravelAgentBackend:
                 price = flight_data.get('price', 'Price not available')
             
             # Extract basic flight information
-            departure_airport = flight_info.get('departure_airport', {})
-            arrival_airport = flight_info.get('arrival_airport', {})
+            departure_airport = flight_info.get('departure_airport') or _EMPTY
+            arrival_airport = flight_info.get('arrival_airport') or _EMPTY
             
             departure_code = departure_airport.get('id', 'Unknown')
             departure_name = departure_airport.get('name', 'Unknown Airport')
@@ -186,103 +325,93 @@ class TravelAgentBackend:
             return {'error': 'Please provide a travel query.'}
         
         try:
-            thread_id = str(uuid.uuid4())
+            thread_id = f"{_THREAD_ID_PREFIX}-{next(_thread_counter)}"
             messages = [HumanMessage(content=user_input)]
             config = {'configurable': {'thread_id': thread_id}}
 
             result = self.agent.graph.invoke({'messages': messages}, config=config)
             
-            # Clean non-tool message content
-            if 'messages' in result:
-                for message in result['messages']:
-                    if hasattr(message, 'content'):
-                        # Preserve tool outputs for parsing
-                        if hasattr(message, 'name') and message.name in ('flights_finder', 'hotels_finder'):
-                            continue
-                        message.content = self.clean_html_content(str(message.content))
-
             # Extract structured data
             flights_data = []
             hotels_data = []
-            response_text = ""
+            # AI replies in order, each distinct reply once
+            response_chunks = []
+            seen_contents = set()
             
             # Look for tool messages and regular responses
             for message in result['messages']:
-                if hasattr(message, 'name') and hasattr(message, 'content'):
+                if isinstance(message, ToolMessage):
                     if message.name == 'flights_finder':
-                        try:
-                            if isinstance(message.content, list):
-                                flights_data = message.content
-                            else:
-                                flights_data = json.loads(str(message.content))
-                        except Exception:
-                            pass
+                        flights_data = _tool_results(message, flights_data)
                     elif message.name == 'hotels_finder':
-                        try:
-                            if isinstance(message.content, list):
-                                hotels_data = message.content
-                            else:
-                                hotels_data = json.loads(str(message.content))
-                        except Exception:
-                            pass
-                elif hasattr(message, 'content'):
-                    # Check if this is an AI response (not a tool message or human message)
-                    message_type = type(message).__name__
-                    if message_type == 'AIMessage' or (not hasattr(message, 'name') and message_type != 'HumanMessage'):
-                        content = str(message.content).strip()
-                        if content and content not in response_text:
-                            response_text += content + "\n"
+                        hotels_data = _tool_results(message, hotels_data)
+                elif isinstance(message, AIMessage):
+                    content = message.content
+                    if not content:
+                        continue
+                    # Only replies that make it into response_text are cleaned; the
+                    # graph's message objects are left untouched
+                    content = self.clean_html_content(content if type(content) is str else str(content))
+                    if content and content not in seen_contents:
+                        seen_contents.add(content)
+                        response_chunks.append(content)
+
+            response_text = "\n".join(response_chunks)
 
             # Parse the structured data
             parsed_flights = []
             parsed_hotels = []
             
             if flights_data and isinstance(flights_data, list):
-                parsed_flights = [self.parse_flight_data(flight) for flight in flights_data[:6]]
+                parsed_flights = [self.parse_flight_data(flight) for flight in flights_data[:RESULT_LIMIT]]
             
             if hotels_data and isinstance(hotels_data, list):
-                parsed_hotels = [self.parse_hotel_data(hotel) for hotel in hotels_data[:6]]
+                parsed_hotels = [self.parse_hotel_data(hotel) for hotel in hotels_data[:RESULT_LIMIT]]
 
             # Generate response text if none was provided by the AI
             if not response_text.strip():
                 if parsed_flights and parsed_hotels:
                     # Create detailed response with flight and hotel information
-                    flight_summary = f"✈️ **Flight Options ({len(parsed_flights)} found):**\n"
-                    for i, flight in enumerate(parsed_flights[:3], 1):
+                    parts = [_FLIGHT_HEADER.format(len(parsed_flights))]
+                    for i, flight in enumerate(parsed_flights[:SUMMARY_LIMIT], 1):
                         airline = flight.get('airline', 'Unknown')
                         price = flight.get('price', 'N/A')
                         duration = flight.get('duration', 'N/A')
-                        flight_summary += f"{i}. {airline} - {price} ({duration})\n"
+                        parts.append(f"{i}. {airline} - {price} ({duration})\n")
+                    flight_summary = "".join(parts)
                     
-                    hotel_summary = f"\n🏨 **Hotel Options ({len(parsed_hotels)} found):**\n"
-                    for i, hotel in enumerate(parsed_hotels[:3], 1):
+                    parts = ["\n", _HOTEL_HEADER.format(len(parsed_hotels))]
+                    for i, hotel in enumerate(parsed_hotels[:SUMMARY_LIMIT], 1):
                         name = hotel.get('name', 'Unknown Hotel')
                         price = hotel.get('price', 'N/A')
                         rating = hotel.get('rating', 'N/A')
-                        hotel_summary += f"{i}. {name} - {price}/night (⭐{rating})\n"
+                        parts.append(f"{i}. {name} - {price}/night (⭐{rating})\n")
+                    hotel_summary = "".join(parts)
                     
                     response_text = f"I found great travel options for you!\n\n{flight_summary}{hotel_summary}\nWould you like more details about any of these options?"
                     
                 elif parsed_flights:
-                    flight_summary = f"✈️ **Flight Options ({len(parsed_flights)} found):**\n"
-                    for i, flight in enumerate(parsed_flights[:3], 1):
+                    parts = [_FLIGHT_HEADER.format(len(parsed_flights))]
+                    for i, flight in enumerate(parsed_flights[:SUMMARY_LIMIT], 1):
                         airline = flight.get('airline', 'Unknown')
                         price = flight.get('price', 'N/A')
                         duration = flight.get('duration', 'N/A')
                         departure = flight.get('departure', {}).get('time', 'N/A')
                         arrival = flight.get('arrival', {}).get('time', 'N/A')
-                        flight_summary += f"{i}. {airline} - {price}\n   Departure: {departure} | Arrival: {arrival} | Duration: {duration}\n"
+                        parts.append(f"{i}. {airline} - {price}\n   Departure: {departure} | Arrival: {arrival} | Duration: {duration}\n")
+                    flight_summary = "".join(parts)
                     
                     response_text = f"I found {len(parsed_flights)} flight options for your trip:\n\n{flight_summary}\nWould you like me to search for hotels as well?"
                     
                 elif parsed_hotels:
-                    hotel_summary = f"🏨 **Hotel Options ({len(parsed_hotels)} found):**\n"
-                    for i, hotel in enumerate(parsed_hotels[:3], 1):
+                    parts = [_HOTEL_HEADER.format(len(parsed_hotels))]
+                    for i, hotel in enumerate(parsed_hotels[:SUMMARY_LIMIT], 1):
                         name = hotel.get('name', 'Unknown Hotel')
                         price = hotel.get('price', 'N/A')
                         rating = hotel.get('rating', 'N/A')
                         location = hotel.get('location', 'N/A')
-                        hotel_summary += f"{i}. {name} - {price}/night\n   Rating: ⭐{rating} | Location: {location}\n"
+                        parts.append(f"{i}. {name} - {price}/night\n   Rating: ⭐{rating} | Location: {location}\n")
+                    hotel_summary = "".join(parts)
                     
                     response_text = f"I found {len(parsed_hotels)} hotel options for your stay:\n\n{hotel_summary}\nWould you like me to search for flights as well?"
                 else:
@@ -303,12 +432,11 @@ class TravelAgentBackend:
             }
     
     def check_environment(self):
-        """Check if required environment variables are set"""
-        missing_env = []
-        if not get_env_var('SERPAPI_API_KEY'):
-            missing_env.append('SERPAPI_API_KEY')
-        if not get_env_var('GOOGLE_API_KEY'):
-            missing_env.append('GOOGLE_API_KEY')
+        """
+        Check if required environment variables are set.
+        The keys are read once per process; call invalidate_env_cache() after changing them.
+        """
+        missing_env = [key for key in ('SERPAPI_API_KEY', 'GOOGLE_API_KEY') if not get_cached_env_var(key)]
         
         return {
             'missing_variables': missing_env,
@@ -316,10 +444,26 @@ class TravelAgentBackend:
         }
 
 
+# Process-wide backend shared by every caller of get_backend()
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the shared TravelAgentBackend, creating it on first call"""
+    global _backend
+    if _backend is None:
+        # Double-checked so threads racing on the first call build only one backend
+        with _backend_lock:
+            if _backend is None:
+                _backend = TravelAgentBackend()
+    return _backend
+
+
 def main():
     """Main function for backend usage"""
     # Initialize the backend
-    backend = TravelAgentBackend()
+    backend = get_backend()
     
     # Check environment
     env_status = backend.check_environment()
@@ -335,6 +479,7 @@ def main():
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=get_env_var('LOG_LEVEL', 'INFO').upper())
     travel_backend = main()
     
     # Example query for testing
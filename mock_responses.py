@@ -0,0 +1,7 @@
+"""
+Canned reply texts shared by the mock backends in api_server.py and api/index.py
+"""
+
+DESTINATIONS_TEXT = "Based on current trends and seasonal considerations, here are some amazing destinations I'd recommend:\n\n🌍 **Top Destinations:**\n\n🏖️ **Beach Destinations:**\n- Maldives (Perfect for relaxation)\n- Bali, Indonesia (Culture + beaches)\n- Santorini, Greece (Romantic getaway)\n\n🏔️ **Adventure Destinations:**\n- Swiss Alps (Hiking & skiing)\n- New Zealand (Outdoor activities)\n- Costa Rica (Wildlife & nature)\n\n🏛️ **Cultural Destinations:**\n- Kyoto, Japan (Traditional culture)\n- Rome, Italy (Historical sites)\n- Istanbul, Turkey (East meets West)\n\nWhat type of experience are you looking for?"
+
+GENERAL_HELP_TEXT = "Thank you for your question! I'm here to help you with all your travel needs. I can assist you with:\n\n✈️ **Flight bookings** - Find the best deals and routes\n🏨 **Hotel reservations** - Discover perfect accommodations\n📅 **Trip planning** - Create detailed itineraries\n🌍 **Destination advice** - Get personalized recommendations\n💰 **Budget planning** - Optimize your travel expenses\n📋 **Travel tips** - Essential information for your journey\n\nWhat specific aspect of your travel would you like help with?"
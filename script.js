@@ -60,6 +60,18 @@ const QUICK_ACTIONS = [
   { icon: 'fas fa-globe-americas', text: 'Explore Destinations', action: 'exploreDestinations' }
 ];
 
+// Hotel star strings for 0-5 stars, built once rather than per card
+const STAR_RATINGS = Array.from({ length: 6 }, (_, n) => '★'.repeat(n) + '☆'.repeat(5 - n));
+
+// Characters escaped by Utils.sanitizeHtml
+const HTML_ESCAPES = {
+  '&': '&amp;',
+  '<': '&lt;',
+  '>': '&gt;',
+  '"': '&quot;',
+  "'": '&#39;'
+};
+
 // ========================================
 // UTILITY FUNCTIONS
 // ========================================
@@ -124,9 +136,8 @@ const Utils = {
    * Sanitize HTML content
    */
   sanitizeHtml(html) {
-    const div = document.createElement('div');
-    div.textContent = html;
-    return div.innerHTML;
+    // Plain string escaping: no throwaway DOM node per field rendered into a card
+    return String(html ?? '').replace(/[&<>"']/g, ch => HTML_ESCAPES[ch]);
   },
 
   /**
@@ -636,6 +647,21 @@ class TravelAgentChat extends EventEmitter {
       });
     }
 
+    // Follow-up suggestions: one delegated listener instead of one per rendered button
+    if (this.elements.followupButtons) {
+      this.elements.followupButtons.addEventListener('click', (e) => {
+        const followupBtn = e.target.closest('.followup-btn');
+        if (followupBtn) {
+          if (this.elements.messageInput) {
+            this.elements.messageInput.value = followupBtn.textContent;
+            this.handleInputChange();
+            this.sendMessage();
+          }
+          this.hideSuggestedFollowups();
+        }
+      });
+    }
+
     // Theme toggle
     if (this.elements.themeToggle) {
       this.elements.themeToggle.addEventListener('click', () => this.toggleTheme());
@@ -1169,7 +1195,7 @@ class TravelAgentChat extends EventEmitter {
           <strong>${Utils.sanitizeHtml(hotel.name || 'Unknown Hotel')}</strong>
           ${hotel.rating ? `
             <div class="hotel-rating">
-              ${'★'.repeat(Math.floor(hotel.rating))}${'☆'.repeat(5 - Math.floor(hotel.rating))}
+              ${STAR_RATINGS[Math.min(5, Math.max(0, Math.floor(hotel.rating) || 0))]}
               <span>(${hotel.rating})</span>
             </div>
           ` : ''}
@@ -1316,25 +1342,19 @@ class TravelAgentChat extends EventEmitter {
   showSuggestedFollowups(suggestions) {
     if (!this.elements.suggestedFollowups || !this.elements.followupButtons) return;
 
-    // Clear existing buttons
-    this.elements.followupButtons.innerHTML = '';
-
-    // Add new buttons
+    // Build the new buttons off-DOM so the container is updated in one insertion
+    const fragment = document.createDocumentFragment();
     suggestions.forEach(suggestion => {
       const btn = document.createElement('button');
       btn.className = 'followup-btn';
       btn.textContent = suggestion;
-      btn.addEventListener('click', () => {
-        if (this.elements.messageInput) {
-          this.elements.messageInput.value = suggestion;
-          this.handleInputChange();
-          this.sendMessage();
-        }
-        this.hideSuggestedFollowups();
-      });
-      this.elements.followupButtons.appendChild(btn);
+      fragment.appendChild(btn);
     });
 
+    // Replace the existing buttons
+    this.elements.followupButtons.innerHTML = '';
+    this.elements.followupButtons.appendChild(fragment);
+
     this.elements.suggestedFollowups.classList.add('show');
   }
 
@@ -1575,10 +1595,12 @@ class TravelAgentChat extends EventEmitter {
     if (conversation.messages && conversation.messages.length > 0) {
       this.hideWelcomeScreen();
       
+      // Render the whole history off-DOM and attach it in one insertion
+      const fragment = document.createDocumentFragment();
       conversation.messages.forEach(message => {
-        const messageElement = this.createMessageElement(message);
-        this.elements.chatMessages.appendChild(messageElement);
+        fragment.appendChild(this.createMessageElement(message));
       });
+      this.elements.chatMessages.appendChild(fragment);
 
       this.scrollToBottom();
     } else {